@@ -0,0 +1,56 @@
+"""colunas tsvector para busca textual
+
+Revision ID: 2c7e5a9d4b18
+Revises: 8d3b6e0f2a41
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c7e5a9d4b18'
+down_revision: Union[str, None] = '8d3b6e0f2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCHABLE_COLUMNS = {
+    'users': 'username',
+    'teams': 'team_name',
+    'projects': 'project_name',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tsvector mantido pelo próprio Postgres (coluna gerada) + índice GIN
+    for table, column in SEARCHABLE_COLUMNS.items():
+        op.add_column(
+            table,
+            sa.Column(
+                'search_vector',
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    f"to_tsvector('simple'::regconfig, {column})",
+                    persisted=True,
+                ),
+                nullable=False,
+            ),
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SEARCHABLE_COLUMNS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,60 @@
+"""tabela de refresh tokens
+
+Revision ID: 3f6d8b2a1c94
+Revises: e91b5f3c7a02
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6d8b2a1c94'
+down_revision: Union[str, None] = 'e91b5f3c7a02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token_hash', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('family_id', sa.String(), nullable=False),
+        sa.Column('token_version', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['user_id'], ['users.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token_hash'),
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_family_id'),
+        'refresh_tokens',
+        ['family_id'],
+        unique=False,
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_user_id'),
+        'refresh_tokens',
+        ['user_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens'
+    )
+    op.drop_index(
+        op.f('ix_refresh_tokens_family_id'), table_name='refresh_tokens'
+    )
+    op.drop_table('refresh_tokens')
@@ -0,0 +1,49 @@
+"""indices de nomes e chaves estrangeiras
+
+Revision ID: 4f2a9c71d8e3
+Revises: cf83ffeb786f
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c71d8e3'
+down_revision: Union[str, None] = 'cf83ffeb786f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # buscas por nome (WHERE ... = / IN (...)) e unicidade dos nomes
+    op.create_index('ix_teams_team_name', 'teams', ['team_name'], unique=True)
+    op.create_index(
+        'ix_projects_project_name', 'projects', ['project_name'], unique=True
+    )
+    # as PKs compostas são (team_id, user_id) e (project_id, team_id);
+    # estes índices atendem as buscas pela segunda coluna
+    op.create_index('ix_teams_users_user_id', 'teams_users', ['user_id'])
+    op.create_index(
+        'ix_projects_teams_team_id', 'projects_teams', ['team_id']
+    )
+    op.create_index(
+        'ix_teams_current_user_id', 'teams', ['current_user_id']
+    )
+    op.create_index(
+        'ix_projects_current_user_id', 'projects', ['current_user_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_current_user_id', table_name='projects')
+    op.drop_index('ix_teams_current_user_id', table_name='teams')
+    op.drop_index('ix_projects_teams_team_id', table_name='projects_teams')
+    op.drop_index('ix_teams_users_user_id', table_name='teams_users')
+    op.drop_index('ix_projects_project_name', table_name='projects')
+    op.drop_index('ix_teams_team_name', table_name='teams')
@@ -0,0 +1,47 @@
+"""cascata nas tabelas de associacao
+
+Revision ID: 5a1c3e8f9b27
+Revises: 2c7e5a9d4b18
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1c3e8f9b27'
+down_revision: Union[str, None] = '2c7e5a9d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabela de associação, coluna, tabela referenciada)
+ASSOCIATION_FOREIGN_KEYS = [
+    ('teams_users', 'team_id', 'teams'),
+    ('teams_users', 'user_id', 'users'),
+    ('projects_teams', 'project_id', 'projects'),
+    ('projects_teams', 'team_id', 'teams'),
+]
+
+
+def _recreate_foreign_keys(ondelete: str | None) -> None:
+    for table, column, referred in ASSOCIATION_FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(
+            name, table, referred, [column], ['id'], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # o banco apaga as linhas de associação junto com o time, projeto ou
+    # usuário, sem o ORM carregar as coleções
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_foreign_keys(None)
@@ -0,0 +1,44 @@
+"""indices de trigramas para busca por nome
+
+Revision ID: 8d3b6e0f2a41
+Revises: 4f2a9c71d8e3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6e0f2a41'
+down_revision: Union[str, None] = '4f2a9c71d8e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # atende LIKE/ILIKE '%x%' e a busca por similaridade (operador %)
+    op.create_index(
+        'ix_teams_team_name_trgm',
+        'teams',
+        ['team_name'],
+        postgresql_using='gin',
+        postgresql_ops={'team_name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_projects_project_name_trgm',
+        'projects',
+        ['project_name'],
+        postgresql_using='gin',
+        postgresql_ops={'project_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_projects_project_name_trgm', table_name='projects')
+    op.drop_index('ix_teams_team_name_trgm', table_name='teams')
@@ -0,0 +1,42 @@
+"""tabela de tokens revogados
+
+Revision ID: e91b5f3c7a02
+Revises: a7d4c2e91f36
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b5f3c7a02'
+down_revision: Union[str, None] = 'a7d4c2e91f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('jti'),
+    )
+    op.create_index(
+        op.f('ix_revoked_tokens_expires_at'),
+        'revoked_tokens',
+        ['expires_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens'
+    )
+    op.drop_table('revoked_tokens')
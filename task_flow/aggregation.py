@@ -0,0 +1,97 @@
+from sqlalchemy import (
+    Select,
+    Text,
+    cast,
+    func,
+    literal_column,
+    null,
+    select,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from task_flow.models import Project, Team, User, projects_teams, teams_users
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def _json_array(document, order_by, *where):
+    aggregate = func.json_agg(aggregate_order_by(document, order_by))
+    if where:
+        aggregate = aggregate.filter(*where)
+    return func.coalesce(aggregate, EMPTY_JSON_ARRAY)
+
+
+def project_documents(*criteria, limit: int, rank=None) -> Select:
+    """Monta no Postgres o JSON de uma página de ``ProjectPublic``.
+
+    O documento projeto → times → usuários é agregado com json_agg e
+    json_build_object sobre projects_teams e teams_users. A query devolve
+    uma única linha com o texto do array pronto para a resposta, o id (e o
+    rank) do último projeto e se existe próxima página, sem criar objetos
+    do ORM nem modelos do Pydantic. Com ``rank`` a página segue a ordem
+    (rank DESC, id) da busca por similaridade.
+    """
+    order_by = (Project.id,) if rank is None else (rank.desc(), Project.id)
+    rank = null() if rank is None else rank
+    users = (
+        select(
+            _json_array(
+                func.json_build_object(
+                    'id',
+                    User.id,
+                    'username',
+                    User.username,
+                    'email',
+                    User.email,
+                ),
+                User.id,
+            )
+        )
+        .select_from(teams_users.join(User))
+        .where(teams_users.c.team_id == Team.id)
+        .scalar_subquery()
+    )
+    teams = (
+        select(
+            _json_array(
+                func.json_build_object(
+                    'id', Team.id, 'team_name', Team.team_name, 'users', users
+                ),
+                Team.id,
+            )
+        )
+        .select_from(projects_teams.join(Team))
+        .where(projects_teams.c.project_id == Project.id)
+        .scalar_subquery()
+    )
+    projects = (
+        select(
+            func.json_build_object(
+                'id',
+                Project.id,
+                'project_name',
+                Project.project_name,
+                'teams',
+                teams,
+            ).label('document'),
+            Project.id,
+            rank.label('rank'),
+            func.row_number().over(order_by=order_by).label('position'),
+        )
+        .where(*criteria)
+        .order_by(*order_by)
+        .limit(limit + 1)
+        .subquery()
+    )
+    in_page = projects.c.position <= limit
+    last = projects.c.position == limit
+
+    return select(
+        cast(
+            _json_array(projects.c.document, projects.c.position, in_page),
+            Text,
+        ),
+        func.max(projects.c.id).filter(last),
+        func.max(projects.c.rank).filter(last),
+        func.count() > limit,
+    )
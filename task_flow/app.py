@@ -1,10 +1,15 @@
 # biblioteca padrão
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
-from task_flow.routers import auth, projects, teams, users
+from task_flow.database import replicas
+from task_flow.replicas import CONSISTENCY_COOKIE, CONSISTENCY_HEADER
+from task_flow.routers import auth, metrics, projects, search, teams, users
 from task_flow.schemas import Message
+from task_flow.settings import Settings
+
+settings = Settings()
 
 app = FastAPI()
 
@@ -13,6 +18,28 @@ app.include_router(auth.router)
 app.include_router(teams.router)
 
 app.include_router(projects.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
+
+
+async def set_consistency_token(request: Request, call_next):
+    # devolve o LSN do commit para o cliente ler do primário em seguida
+    response = await call_next(request)
+    commit_lsn = getattr(request.state, 'commit_lsn', None)
+    if commit_lsn:
+        response.headers[CONSISTENCY_HEADER] = commit_lsn
+        response.set_cookie(
+            CONSISTENCY_COOKIE,
+            commit_lsn,
+            max_age=settings.CONSISTENCY_TOKEN_MAX_AGE,
+            httponly=True,
+        )
+    return response
+
+
+# o middleware só é necessário quando há réplicas de leitura
+if replicas:
+    app.middleware('http')(set_consistency_token)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
@@ -0,0 +1,49 @@
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+
+def add_links(session: Session, owner, owner_id: int, target, target_ids):
+    """Insere só os pares (owner_id, alvo) que ainda não existem.
+
+    ``owner`` e ``target`` são as duas colunas da tabela de associação
+    (por exemplo ``teams_users.c.team_id`` e ``teams_users.c.user_id``).
+    Retorna os ids de ``target`` efetivamente inseridos.
+    """
+    if not target_ids:
+        return []
+    return session.scalars(
+        insert(owner.table)
+        .values([
+            {owner.key: owner_id, target.key: target_id}
+            for target_id in target_ids
+        ])
+        .on_conflict_do_nothing()
+        .returning(target)
+    ).all()
+
+
+def remove_links(session: Session, owner, owner_id: int, target, target_ids):
+    """Remove os pares informados e retorna os ids de ``target`` removidos."""
+    return session.scalars(
+        delete(owner.table)
+        .where(owner == owner_id, target.in_(target_ids))
+        .returning(target)
+    ).all()
+
+
+def has_links(session: Session, owner, owner_id: int) -> bool:
+    return session.scalar(select(exists().where(owner == owner_id)))
+
+
+def replace_links(session: Session, owner, owner_id: int, target, target_ids):
+    """Deixa ``owner_id`` ligado exatamente a ``target_ids``.
+
+    A diferença é calculada no banco: um DELETE dos pares que saíram e um
+    INSERT ... ON CONFLICT DO NOTHING dos que entraram, sem carregar a
+    coleção atual.
+    """
+    session.execute(
+        delete(owner.table).where(owner == owner_id, target.not_in(target_ids))
+    )
+    add_links(session, owner, owner_id, target, target_ids)
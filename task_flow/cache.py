@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache LRU limitado em que cada entrada expira depois de um TTL.
+
+    É um cache por worker, protegido por lock para os endpoints síncronos
+    que rodam no threadpool.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            expires_at, value = self._data.get(key, (0.0, _MISSING))
+            if value is _MISSING or expires_at <= monotonic():
+                self._data.pop(key, None)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,58 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from task_flow.cache import TTLCache
+from task_flow.models import Project, Team, User
+from task_flow.settings import Settings
+
+settings = Settings()
+
+# recursos que podem ser contados, pelo nome usado na API
+COUNTED_MODELS = {'users': User, 'teams': Team, 'projects': Project}
+
+# reltuples é -1 enquanto a tabela nunca foi analisada; nesse caso usa o
+# n_live_tup do coletor de estatísticas
+ESTIMATE = text(
+    'SELECT CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint '
+    'ELSE s.n_live_tup END '
+    'FROM pg_class c '
+    'LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid '
+    'WHERE c.oid = to_regclass(:table)'
+)
+
+
+class RowCounter:
+    """Contagem de linhas exata ou estimada, com cache TTL na frente.
+
+    ``exact`` faz um ``SELECT count(*)``; ``estimate`` lê as estatísticas
+    do planner, que custam uma linha de catálogo em vez de uma varredura da
+    tabela. Os dois resultados ficam em cache por ``ttl`` segundos.
+    """
+
+    def __init__(self, ttl: float):
+        self.cache = TTLCache(maxsize=2 * len(COUNTED_MODELS), ttl=ttl)
+
+    def exact(self, session: Session, model) -> int:
+        key = ('exact', model.__tablename__)
+        count = self.cache.get(key)
+        if count is None:
+            count = session.scalar(select(func.count()).select_from(model))
+            self.cache.set(key, count)
+        return count
+
+    def estimate(self, session: Session, model) -> int:
+        key = ('estimate', model.__tablename__)
+        count = self.cache.get(key)
+        if count is None:
+            count = session.scalar(ESTIMATE, {'table': model.__tablename__})
+            # sem estatísticas ainda: a contagem exata é a única resposta
+            if not count:
+                count = self.exact(session, model)
+            self.cache.set(key, count)
+        return count
+
+    def clear(self):
+        self.cache.clear()
+
+
+row_counter = RowCounter(ttl=settings.COUNT_CACHE_TTL)
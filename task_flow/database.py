@@ -1,17 +1,131 @@
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from task_flow.models import User
+from task_flow.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from task_flow.replicas import (
+    CONSISTENCY_COOKIE,
+    CONSISTENCY_HEADER,
+    CURRENT_LSN,
+    REPLAY_LSN,
+    Replica,
+    ReplicaSet,
+    RoutingSession,
+    parse_lsn,
+    replica_can_serve,
+)
 from task_flow.settings import Settings
 
-engine = create_engine(Settings().DATABASE_URL)
+settings = Settings()
 
 
-def get_session():  # pragma: no cover
-    with Session(engine) as session:
+def engine_options() -> dict:
+    """Parâmetros do pool de conexões lidos do Settings."""
+    return {
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+        'pool_use_lifo': settings.DATABASE_POOL_USE_LIFO,
+    }
+
+
+def create_engines(url: str):
+    # o dialeto postgresql+psycopg escolhe o driver assíncrono do psycopg
+    return (
+        create_engine(
+            url, poolclass=InstrumentedQueuePool, **engine_options()
+        ),
+        create_async_engine(
+            url, poolclass=InstrumentedAsyncQueuePool, **engine_options()
+        ),
+    )
+
+
+engine, async_engine = create_engines(settings.DATABASE_URL)
+replicas = ReplicaSet(
+    [Replica(*create_engines(url)) for url in settings.DATABASE_REPLICA_URLS],
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL,
+)
+
+
+def consistency_token(request: Request) -> int | None:
+    """LSN do último commit que o cliente viu, se ele enviou um."""
+    return parse_lsn(
+        request.headers.get(CONSISTENCY_HEADER)
+        or request.cookies.get(CONSISTENCY_COOKIE)
+    )
+
+
+def _reads_from_replica(request: Request) -> bool:
+    return bool(replicas) and request.method in {'GET', 'HEAD'}
+
+
+def read_replica(request: Request) -> Replica | None:
+    """Escolhe a réplica que atende um GET; None usa o primário."""
+    if not _reads_from_replica(request):
+        return None
+
+    token = consistency_token(request)
+    for replica in replicas.candidates():
+        if token is None and not replicas.needs_check(replica):
+            return replica
+        try:
+            with replica.engine.connect() as connection:
+                replay_lsn = connection.scalar(REPLAY_LSN)
+        except OperationalError:
+            replicas.mark_unhealthy(replica)
+            continue
+        replica.mark_healthy()
+        if replica_can_serve(replay_lsn, token):
+            return replica
+
+    return None
+
+
+async def async_read_replica(request: Request) -> Replica | None:
+    if not _reads_from_replica(request):
+        return None
+
+    token = consistency_token(request)
+    for replica in replicas.candidates():
+        if token is None and not replicas.needs_check(replica):
+            return replica
+        try:
+            async with replica.async_engine.connect() as connection:
+                replay_lsn = await connection.scalar(REPLAY_LSN)
+        except OperationalError:
+            replicas.mark_unhealthy(replica)
+            continue
+        replica.mark_healthy()
+        if replica_can_serve(replay_lsn, token):
+            return replica
+
+    return None
+
+
+def get_session(request: Request):  # pragma: no cover
+    replica = read_replica(request)
+    with RoutingSession(
+        engine, replica=replica.engine if replica else None
+    ) as session:
         yield session
 
+        # o LSN do commit vira o token de consistência da resposta
+        if replicas and session.info.get('committed'):
+            request.state.commit_lsn = session.scalar(CURRENT_LSN)
+
+
+async def get_async_session(request: Request):  # pragma: no cover
+    replica = await async_read_replica(request)
+    async with AsyncSession(
+        async_engine,
+        sync_session_class=RoutingSession,
+        replica=replica.async_engine.sync_engine if replica else None,
+    ) as session:
+        yield session
 
-def get_user_count(session: Session) -> int:
-    """Get the count of users in the database."""
-    return len(session.execute(select(User)).all())
+        if replicas and session.info.get('committed'):
+            request.state.commit_lsn = await session.scalar(CURRENT_LSN)
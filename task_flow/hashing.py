@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from time import perf_counter
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from task_flow.settings import Settings
+
+settings = Settings()
+# importado também pelos processos do pool: não depende do banco
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password_hash(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def verify_and_update_hash(
+    password: str, hashed: str
+) -> tuple[bool, str | None]:
+    """Verifica a senha e, se o hash usa parâmetros antigos, refaz o hash."""
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class HashingSaturated(Exception):
+    """A fila do pool de hashing está cheia ou o pool caiu."""
+
+
+async def _gather(futures) -> list:
+    return await asyncio.gather(*map(asyncio.wrap_future, futures))
+
+
+def wait_results(futures) -> list:
+    """Resultados dos futures, sem bloquear o event loop no modo assíncrono.
+
+    Dentro do ``run_sync`` da AsyncSession o endpoint roda em um greenlet
+    sobre o event loop; ali a espera vira um ``await`` (como as consultas
+    ao banco) e o loop segue atendendo as outras requisições. Nas rotas
+    síncronas a thread do threadpool fica bloqueada até o resultado.
+    """
+    if in_greenlet():
+        return await_only(_gather(futures))
+    return [future.result() for future in futures]
+
+
+class HashingExecutor:
+    """Pool de processos para o Argon2, com fila limitada e métricas.
+
+    O Argon2 ocupa a CPU por dezenas de milissegundos por senha. Nos
+    processos do pool ele roda fora do GIL e sem ocupar o event loop nem
+    as threads que atendem as outras rotas. Cada senha ocupa uma posição
+    da fila; com ``max_pending`` senhas na fila, novos pedidos são
+    recusados (HashingSaturated) em vez de atrasar toda a API.
+    """
+
+    def __init__(self, max_workers: int | None, max_pending: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._pool = None
+        self._lock = Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.calls = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # criado no primeiro uso; 'spawn' evita herdar por fork as
+        # threads e conexões do servidor
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        # um processo morto (OOM, por exemplo) quebra o pool inteiro: o
+        # próximo pedido sobe um pool novo
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _reserve(self, tasks: int):
+        with self._lock:
+            if self.pending + tasks > self.max_pending:
+                self.rejected += 1
+                raise HashingSaturated
+            self.pending += tasks
+
+    def _release(self, tasks: int, seconds: float):
+        with self._lock:
+            self.pending -= tasks
+            self.completed += tasks
+            self.calls += 1
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def map(self, function, *iterables) -> list:
+        """Roda ``function`` no pool e espera todos os resultados."""
+        arguments = list(zip(*iterables))
+        self._reserve(len(arguments))
+        start = perf_counter()
+        pool = self.pool
+        try:
+            futures = [pool.submit(function, *args) for args in arguments]
+            return wait_results(futures)
+        except BrokenProcessPool as error:
+            self._discard(pool)
+            raise HashingSaturated from error
+        finally:
+            self._release(len(arguments), perf_counter() - start)
+
+    def run(self, function, *args):
+        return self.map(function, *[[arg] for arg in args])[0]
+
+    def status(self) -> dict:
+        # latência de cada chamada, da entrada na fila ao resultado
+        with self._lock:
+            calls = self.calls
+            return {
+                'workers': self.max_workers,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'latency_avg_ms': (
+                    self.latency_total / calls * 1000 if calls else 0.0
+                ),
+                'latency_max_ms': self.latency_max * 1000,
+            }
+
+
+hashing_executor = HashingExecutor(
+    max_workers=settings.HASHING_WORKERS,
+    max_pending=settings.HASHING_MAX_PENDING,
+)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hashes de ``passwords``, na mesma ordem, em paralelo no pool.
+
+    O lote vai em levas de no máximo uma senha por processo, e cada leva
+    reserva uma posição da fila por senha. Um login que chega durante um
+    lote grande entra na fila do pool antes da leva seguinte, então espera
+    no máximo uma leva; com a fila cheia ele recebe 503 como qualquer
+    outro pedido.
+    """
+    wave = max(
+        1, min(hashing_executor.max_workers, hashing_executor.max_pending)
+    )
+    hashed = []
+    for start in range(0, len(passwords), wave):
+        hashed += hashing_executor.map(
+            hash_password, passwords[start : start + wave]
+        )
+    return hashed
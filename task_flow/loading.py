@@ -0,0 +1,26 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from task_flow.models import Project, Team
+from task_flow.schemas import ProjectPublic, TeamPublic
+
+# relacionamentos que cada schema de resposta serializa
+RESPONSE_RELATIONSHIPS = {
+    TeamPublic: [(Team.users,)],
+    ProjectPublic: [(Project.teams, Team.users)],
+}
+
+
+def load_options(schema, *, many: bool = True) -> list:
+    """Opções de eager loading para serializar ``schema`` sem N+1.
+
+    Listas usam selectinload em todos os níveis (uma query por nível,
+    independente do número de linhas). Respostas de um único objeto usam
+    joinedload no primeiro nível, trazendo tudo junto com a própria linha.
+    """
+    options = []
+    for first, *rest in RESPONSE_RELATIONSHIPS.get(schema, []):
+        option = (selectinload if many else joinedload)(first)
+        for relationship in rest:
+            option = option.selectinload(relationship)
+        options.append(option)
+    return options
@@ -1,34 +1,105 @@
 from datetime import datetime
 
-from sqlalchemy import Column, ForeignKey, Table, func
+from sqlalchemy import (
+    DDL,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Table,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
 
+# os índices GIN de trigramas (busca por nome) dependem da extensão
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'),
+)
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """Índice GIN que atende LIKE/ILIKE '%x%' e o operador % do pg_trgm."""
+    return Index(
+        name,
+        column,
+        postgresql_using='gin',
+        postgresql_ops={column: 'gin_trgm_ops'},
+    )
+
+
+def search_vector(column: str):
+    """tsvector gerado pelo Postgres a partir do nome (busca em /search).
+
+    Fica fora dos SELECTs do ORM (deferred): só a busca lê a coluna.
+    """
+    return mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('simple'::regconfig, {column})", persisted=True
+        ),
+        init=False,
+        repr=False,
+        deferred=True,
+    )
+
+
+def search_index(name: str) -> Index:
+    return Index(name, 'search_vector', postgresql_using='gin')
+
 
 teams_users = Table(
     'teams_users',
     table_registry.metadata,
-    Column('user_id', ForeignKey('users.id'), primary_key=True),
-    Column('team_id', ForeignKey('teams.id'), primary_key=True),
+    Column(
+        'team_id', ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True
+    ),
+    # a PK (team_id, user_id) não atende buscas pelo usuário
+    Column(
+        'user_id',
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+    ),
 )
 
 projects_teams = Table(
     'projects_teams',
     table_registry.metadata,
-    Column('project_id', ForeignKey('projects.id'), primary_key=True),
-    Column('team_id', ForeignKey('teams.id'), primary_key=True),
+    Column(
+        'project_id',
+        ForeignKey('projects.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    Column(
+        'team_id',
+        ForeignKey('teams.id', ondelete='CASCADE'),
+        primary_key=True,
+        index=True,
+    ),
 )
 
 
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __table_args__ = (search_index('ix_users_search_vector'),)
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
+    # incrementada para revogar todos os tokens já emitidos do usuário
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+    search_vector: Mapped[str] = search_vector('username')
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -36,17 +107,27 @@ class User:
         init=False, server_default=func.now(), onupdate=func.now()
     )
 
+    # passive_deletes: o ON DELETE CASCADE limpa teams_users
     teams: Mapped[list['Team']] = relationship(
-        'Team', secondary=teams_users, back_populates='users', init=False
+        'Team',
+        secondary=teams_users,
+        back_populates='users',
+        init=False,
+        passive_deletes=True,
     )
 
 
 @table_registry.mapped_as_dataclass
 class Team:
     __tablename__ = 'teams'
+    __table_args__ = (
+        trigram_index('ix_teams_team_name_trgm', 'team_name'),
+        search_index('ix_teams_search_vector'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    team_name: Mapped[str]
+    team_name: Mapped[str] = mapped_column(unique=True, index=True)
+    search_vector: Mapped[str] = search_vector('team_name')
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -54,28 +135,88 @@ class Team:
         init=False, server_default=func.now(), onupdate=func.now()
     )
 
-    current_user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    current_user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), index=True
+    )
 
     users: Mapped[list[User]] = relationship(
-        'User', secondary=teams_users, back_populates='teams', init=False
+        'User',
+        secondary=teams_users,
+        back_populates='teams',
+        init=False,
+        passive_deletes=True,
     )
     projects: Mapped[list['Project']] = relationship(
-        'Project', secondary=projects_teams, back_populates='teams', init=False
+        'Project',
+        secondary=projects_teams,
+        back_populates='teams',
+        init=False,
+        passive_deletes=True,
     )
 
 
 @table_registry.mapped_as_dataclass
 class Project:
     __tablename__ = 'projects'
+    __table_args__ = (
+        trigram_index('ix_projects_project_name_trgm', 'project_name'),
+        search_index('ix_projects_search_vector'),
+    )
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    project_name: Mapped[str]
+    project_name: Mapped[str] = mapped_column(unique=True, index=True)
+    search_vector: Mapped[str] = search_vector('project_name')
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
-    current_user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    current_user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), index=True
+    )
     teams: Mapped[list[Team]] = relationship(
-        'Team', secondary=projects_teams, back_populates='projects', init=False
+        'Team',
+        secondary=projects_teams,
+        back_populates='projects',
+        init=False,
+        passive_deletes=True,
+    )
+
+
+@table_registry.mapped_as_dataclass
+class RevokedToken:
+    """Token JWT revogado antes do exp (logout ou refresh)."""
+
+    __tablename__ = 'revoked_tokens'
+
+    jti: Mapped[str] = mapped_column(primary_key=True)
+    # depois do exp o token já é recusado: a linha pode ser apagada
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
+
+
+@table_registry.mapped_as_dataclass
+class RefreshToken:
+    """Refresh token opaco; só o hash SHA-256 fica no banco.
+
+    Cada uso troca o token por um novo da mesma família. Um token já
+    usado que aparece de novo indica vazamento: a família é revogada.
+    Como os access tokens, ele cai quando o token_version do usuário muda.
+    """
+
+    __tablename__ = 'refresh_tokens'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    token_hash: Mapped[str] = mapped_column(unique=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), index=True
+    )
+    family_id: Mapped[str] = mapped_column(index=True)
+    # token_version do usuário na emissão; se mudar, o token não vale mais
+    token_version: Mapped[int]
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # preenchido quando o token é trocado por outro
+    used_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
     )
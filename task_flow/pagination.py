@@ -0,0 +1,93 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, cast, or_
+from sqlalchemy.orm import Session
+
+
+def invalid_cursor():
+    return HTTPException(
+        status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+        detail='Invalid cursor',
+    )
+
+
+def encode_cursor(last_id: int, rank: float | None = None) -> str:
+    value = str(last_id) if rank is None else f'{rank!r}:{last_id}'
+    return urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        return int(urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise invalid_cursor()
+
+
+def decode_ranked_cursor(cursor: str | None) -> tuple[float, int] | None:
+    """Cursor das buscas por similaridade: rank e id da última linha."""
+    if cursor is None:
+        return None
+    try:
+        rank, last_id = urlsafe_b64decode(cursor.encode()).split(b':')
+        return float(rank), int(last_id)
+    except (binascii.Error, ValueError):
+        raise invalid_cursor()
+
+
+def after_ranked(rank, column, cursor: tuple[float, int]):
+    """Linhas depois do cursor na ordem (rank DESC, id ASC)."""
+    last_rank, last_id = cursor
+    # compara no tipo do rank (real): o float do cursor vira o mesmo valor
+    last_rank = cast(last_rank, rank.type)
+    return or_(rank < last_rank, and_(rank == last_rank, column > last_id))
+
+
+def keyset_page(session: Session, query: Select, column, page, rank=None):
+    """Busca uma página de ``query`` ordenada por ``column`` (seek).
+
+    Em vez de OFFSET, a página começa depois do último id da anterior,
+    então o custo não cresce com a profundidade. Uma linha a mais é lida
+    só para saber se existe próxima página. Com ``rank`` a ordem passa a
+    ser (rank DESC, id) e o cursor guarda os dois valores.
+    """
+    if rank is not None:
+        return _ranked_page(session, query, column, page, rank)
+
+    after = decode_cursor(page.cursor)
+    if after is not None:
+        query = query.where(column > after)
+
+    rows = session.scalars(query.order_by(column).limit(page.limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key))
+
+    return rows, next_cursor
+
+
+def _ranked_page(session: Session, query: Select, column, page, rank):
+    after = decode_ranked_cursor(page.cursor)
+    if after is not None:
+        query = query.where(after_ranked(rank, column, after))
+
+    results = session.execute(
+        query
+        .add_columns(rank)
+        .order_by(rank.desc(), column)
+        .limit(page.limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(results) > page.limit:
+        results = results[: page.limit]
+        last, last_rank = results[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last_rank)
+
+    return [row for row, _ in results], next_cursor
@@ -0,0 +1,95 @@
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Contadores de espera por conexão de um pool, por worker.
+
+    A espera vai do pedido até o pool entregar uma vaga: o tempo de abrir
+    uma conexão nova e o pre-ping ficam de fora, para que as métricas
+    mostrem só a fila.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    # as marcas ficam no registro da conexão, que até o fim do connect()
+    # pertence só a este checkout; o _do_get do QueuePool pode chamar a
+    # si mesmo, então a espera é calculada uma vez, no connect()
+    def _create_connection(self):
+        start = perf_counter()
+        record = super()._create_connection()
+        vars(record)['_opened_in'] = perf_counter() - start
+        return record
+
+    def _do_get(self):
+        record = super()._do_get()
+        vars(record)['_got_at'] = perf_counter()
+        return record
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        marks = vars(connection._connection_record)
+        opened_in = marks.pop('_opened_in', 0.0)
+        self.metrics.record_wait(marks.pop('_got_at') - start - opened_in)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(
+    _InstrumentedPoolMixin, AsyncAdaptedQueuePool
+):
+    pass
+
+
+def pool_status(name: str, pool) -> dict:
+    """Retrata o estado atual de um pool instrumentado."""
+    metrics = pool.metrics
+    return {
+        'name': name,
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        # o overflow do QueuePool começa negativo (-pool_size)
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': pool._max_overflow,
+        'waits': metrics.waits,
+        'wait_time_avg_ms': (
+            metrics.wait_time_total / metrics.waits * 1000
+            if metrics.waits
+            else 0.0
+        ),
+        'wait_time_max_ms': metrics.wait_time_max * 1000,
+        'timeouts': metrics.timeouts,
+    }
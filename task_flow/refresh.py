@@ -0,0 +1,117 @@
+from datetime import timedelta
+from hashlib import sha256
+from secrets import token_urlsafe
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from task_flow.models import RefreshToken, User
+from task_flow.settings import Settings
+
+settings = Settings()
+
+
+def refresh_token_hash(token: str) -> str:
+    # o token tem 256 bits aleatórios: SHA-256 basta, sem custo de Argon2
+    return sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(
+    session: Session,
+    user_id: int,
+    token_version: int,
+    family_id: str | None = None,
+) -> str:
+    """Cria um refresh token para o usuário; None começa uma nova família.
+
+    Só o hash é gravado; o token em claro vai apenas para o cliente.
+    """
+    token = token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=refresh_token_hash(token),
+            user_id=user_id,
+            family_id=family_id or uuid4().hex,
+            token_version=token_version,
+            # relógio do banco, o mesmo das comparações com now()
+            expires_at=func.now()
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    # tokens vencidos do usuário saem junto com a emissão de um novo
+    session.execute(
+        delete(RefreshToken).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.expires_at <= func.now(),
+        )
+    )
+    return token
+
+
+def rotate_refresh_token(
+    session: Session, token: str
+) -> tuple[int, str] | None:
+    """Troca o refresh token por um novo da mesma família.
+
+    Retorna o id do usuário e o novo token, ou None se o token não vale.
+    O UPDATE marca o token como usado e só casa com um token ainda não
+    usado, então dois pedidos simultâneos com o mesmo token não geram
+    duas trocas; também não casa com um token emitido antes de o
+    token_version do usuário mudar (troca de email). Um token já usado é
+    reuso: a família inteira é apagada e o chamador precisa fazer o
+    commit mesmo recusando o pedido.
+    """
+    token_hash = refresh_token_hash(token)
+    row = session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+            RefreshToken.token_version
+            == select(User.token_version)
+            .where(User.id == RefreshToken.user_id)
+            .scalar_subquery(),
+        )
+        .values(used_at=func.now())
+        .returning(
+            RefreshToken.user_id,
+            RefreshToken.family_id,
+            RefreshToken.token_version,
+        )
+    ).first()
+
+    if row is None:
+        family_id = session.scalar(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.used_at.is_not(None),
+            )
+        )
+        if family_id is not None:
+            revoke_refresh_family(session, family_id)
+        return None
+
+    user_id, family_id, token_version = row
+    return user_id, issue_refresh_token(
+        session, user_id, token_version, family_id
+    )
+
+
+def revoke_refresh_family(session: Session, family_id: str):
+    session.execute(
+        delete(RefreshToken).where(RefreshToken.family_id == family_id)
+    )
+
+
+def revoke_refresh_token(session: Session, token: str, user_id: int):
+    """Revoga a família do refresh token, se ele for do usuário."""
+    family_id = session.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == refresh_token_hash(token),
+            RefreshToken.user_id == user_id,
+        )
+    )
+    if family_id is not None:
+        revoke_refresh_family(session, family_id)
@@ -0,0 +1,92 @@
+from itertools import count
+from threading import Lock
+from time import monotonic
+
+from sqlalchemy import Delete, Insert, Update, event, text
+from sqlalchemy.orm import Session
+
+CONSISTENCY_HEADER = 'X-Consistency-Token'
+CONSISTENCY_COOKIE = 'consistency_token'
+
+CURRENT_LSN = text('SELECT pg_current_wal_lsn()::text')
+REPLAY_LSN = text('SELECT pg_last_wal_replay_lsn()::text')
+
+
+def parse_lsn(lsn: str | None) -> int | None:
+    """Converte um LSN do Postgres ('16/B374D848') em inteiro."""
+    try:
+        high, low = lsn.split('/')
+        return (int(high, 16) << 32) + int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+class Replica:
+    def __init__(self, engine, async_engine):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.checked_at = 0.0
+        self.retry_at = 0.0
+
+    def mark_healthy(self):
+        self.checked_at = monotonic()
+
+
+class ReplicaSet:
+    """Round-robin entre as réplicas de leitura que estão saudáveis."""
+
+    def __init__(self, replicas: list[Replica], check_interval: float):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._counter = count()
+        self._lock = Lock()
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def candidates(self) -> list[Replica]:
+        """Réplicas saudáveis, começando pela próxima da fila."""
+        if not self.replicas:
+            return []
+        with self._lock:
+            start = next(self._counter) % len(self.replicas)
+        now = monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.retry_at <= now]
+
+    def needs_check(self, replica: Replica) -> bool:
+        return monotonic() - replica.checked_at > self.check_interval
+
+    def mark_unhealthy(self, replica: Replica):
+        # a réplica volta a ser testada depois de check_interval
+        replica.retry_at = monotonic() + self.check_interval
+
+
+def replica_can_serve(replay_lsn: str | None, token: int | None) -> bool:
+    """A réplica já aplicou o último commit visto pelo cliente?"""
+    if token is None:
+        return True
+    replayed = parse_lsn(replay_lsn)
+    return replayed is not None and replayed >= token
+
+
+class RoutingSession(Session):
+    """Sessão que envia leituras para a réplica e escritas para o primário."""
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is not None
+            and not self._flushing
+            and not isinstance(clause, (Insert, Update, Delete))
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _mark_committed(session):
+    session.info['committed'] = True
@@ -0,0 +1,145 @@
+import math
+from datetime import datetime
+from hashlib import blake2b
+from threading import Lock
+from time import monotonic
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from task_flow.models import RevokedToken
+from task_flow.settings import Settings
+
+settings = Settings()
+
+
+class BloomFilter:
+    """Conjunto probabilístico: sem falsos negativos, poucos positivos.
+
+    Usa ``bits`` bits e ``hashes`` posições por chave, calculadas por
+    double hashing sobre um único blake2b.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.bits = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.bits
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """Tokens revogados: Bloom filter por worker na frente da tabela.
+
+    Um jti fora do filtro com certeza não foi revogado, e a requisição
+    segue sem consultar o banco; só um positivo (revogado ou falso
+    positivo) confere a tabela revoked_tokens. O filtro é reconstruído a
+    cada ``refresh_interval`` segundos para trazer as revogações feitas
+    por outros workers e esquecer os tokens que já expiraram.
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float, refresh_interval: float
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self._lock = Lock()
+        self.clear()
+        # a tabela é carregada na primeira verificação
+        self.rebuilt_at = None
+
+    def clear(self):
+        """Filtro vazio, considerado atualizado (tabela vazia)."""
+        with self._lock:
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+            self.rebuilt_at = monotonic()
+            self._recent = []
+
+    def _claim_rebuild(self) -> bool:
+        # só uma thread reconstrói; as outras seguem com o filtro atual
+        with self._lock:
+            if (
+                self.rebuilt_at is not None
+                and monotonic() - self.rebuilt_at < self.refresh_interval
+            ):
+                return False
+            self.rebuilt_at = monotonic()
+            self._recent = []
+            return True
+
+    def rebuild(self, session: Session):
+        if not self._claim_rebuild():
+            return
+        jtis = session.scalars(
+            select(RevokedToken.jti).where(
+                RevokedToken.expires_at > func.now()
+            )
+        ).all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            # revogações deste worker durante a leitura da tabela
+            for jti in self._recent:
+                bloom.add(jti)
+            self.bloom = bloom
+
+    def add(self, jti: str):
+        with self._lock:
+            self.bloom.add(jti)
+            self._recent.append(jti)
+
+    def is_revoked(self, session: Session, jti: str) -> bool:
+        self.rebuild(session)
+        if jti not in self.bloom:
+            return False
+        return session.scalar(select(exists().where(RevokedToken.jti == jti)))
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOKED_TOKENS_CAPACITY,
+    error_rate=settings.REVOKED_TOKENS_ERROR_RATE,
+    refresh_interval=settings.REVOKED_TOKENS_REFRESH_INTERVAL,
+)
+
+
+def revoke_token(session: Session, claims: dict):
+    """Grava o jti do token em revoked_tokens e no filtro deste worker.
+
+    Aproveita a escrita para apagar as linhas de tokens já expirados.
+    """
+    session.execute(
+        insert(RevokedToken)
+        .values(
+            jti=claims['jti'],
+            expires_at=datetime.fromtimestamp(
+                claims['exp'], tz=ZoneInfo('UTC')
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    session.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+    )
+    revocation_list.add(claims['jti'])
@@ -1,51 +1,118 @@
+import math
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from task_flow.database import get_session
 from task_flow.models import User
-from task_flow.schemas import Token
+from task_flow.refresh import (
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from task_flow.revocation import revoke_token
+from task_flow.routing import SessionRoute
+from task_flow.schemas import Message, RefreshTokenSchema, Token
 from task_flow.security import (
     create_access_token,
+    decode_token,
     get_current_user,
-    verify_password,
+    invalid_credentials,
+    oauth2_scheme,
+    token_claims,
+    verify_and_update_password,
 )
+from task_flow.throttling import login_throttle
 
-router = APIRouter(prefix='/auth', tags=['auth'])
+router = APIRouter(prefix='/auth', tags=['auth'], route_class=SessionRoute)
 
 T_Session = Annotated[Session, Depends(get_session)]
 T_OAuthForm = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
 @router.post('/token', response_model=Token)
-def login_for_access_token(session: T_Session, form_data: T_OAuthForm):
+def login_for_access_token(
+    request: Request, session: T_Session, form_data: T_OAuthForm
+):
+    # recusa antes de qualquer leitura do banco ou hash de senha
+    client_ip = request.client.host if request.client else 'unknown'
+    retry_after = login_throttle.retry_after(client_ip, form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts, try again later',
+            headers={'Retry-After': str(math.ceil(retry_after))},
+        )
+
     user = session.scalar(select(User).where(User.email == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.password):
+    valid, new_hash = (
+        verify_and_update_password(form_data.password, user.password)
+        if user
+        else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Invalid username or password',
         )
 
     # a Claim sub é o padrão do JWT para o usuário
-    # o token é gerado com o email do usuário
-    access_token = create_access_token(data={'sub': user.email})
+    # o token é gerado com o id e a versão de token do usuário
+    access_token = create_access_token(data=token_claims(user))
+    refresh_token = issue_refresh_token(session, user.id, user.token_version)
+
+    # hash com parâmetros antigos do Argon2: troca aproveitando a senha
+    # em claro do login, sem exigir reset
+    if new_hash is not None:
+        session.execute(
+            update(User).where(User.id == user.id).values(password=new_hash)
+        )
+    session.commit()
 
     return {
         'access_token': access_token,
         'token_type': 'Bearer',  # bearer é o padrão do OAuth2
+        'refresh_token': refresh_token,
     }
 
 
 @router.post('/refresh_token', response_model=Token)
-# aqui estamos apenas criando um novo token para o usuário já autenticado
-def refresh_access_token(
+# troca o refresh token por um novo par de tokens, sem verificar a senha
+def refresh_access_token(session: T_Session, body: RefreshTokenSchema):
+    rotated = rotate_refresh_token(session, body.refresh_token)
+    if rotated is None:
+        # grava a revogação da família em caso de reuso
+        session.commit()
+        raise invalid_credentials()
+
+    user_id, refresh_token = rotated
+    user = session.get(User, user_id)
+    new_access_token = create_access_token(data=token_claims(user))
+    session.commit()
+
+    return {
+        'access_token': new_access_token,
+        'token_type': 'bearer',
+        'refresh_token': refresh_token,
+    }
+
+
+@router.post('/logout', response_model=Message)
+def logout(
+    session: T_Session,
+    body: RefreshTokenSchema | None = None,
     user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
 ):
-    new_access_token = create_access_token(data={'sub': user.email})
+    revoke_token(session, decode_token(token))
+    # com o refresh token, a sessão inteira (a família) é encerrada
+    if body is not None:
+        revoke_refresh_token(session, body.refresh_token, user.id)
+    session.commit()
 
-    return {'access_token': new_access_token, 'token_type': 'bearer'}
+    return {'message': 'Logged out'}
@@ -0,0 +1,69 @@
+import os
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from task_flow.counting import COUNTED_MODELS, row_counter
+from task_flow.database import async_engine, engine, get_session, replicas
+from task_flow.hashing import hashing_executor
+from task_flow.pool import pool_status
+from task_flow.routing import SessionRoute
+from task_flow.schemas import (
+    HashingStatus,
+    PoolStatusList,
+    RowCounts,
+    TokenCacheStatus,
+)
+from task_flow.security import Principal, get_current_principal
+from task_flow.settings import Settings
+from task_flow.tokens import token_cache
+
+router = APIRouter(
+    prefix='/metrics', tags=['metrics'], route_class=SessionRoute
+)
+
+T_Session = Annotated[Session, Depends(get_session)]
+# as métricas expõem detalhes internos: só para usuários autenticados
+T_Principal = Annotated[Principal, Depends(get_current_principal)]
+
+settings = Settings()
+
+
+@router.get('/pool', response_model=PoolStatusList)
+def read_pool_metrics(current_user: T_Principal):
+    # cada worker do uvicorn tem o próprio pool, por isso o pid
+    primary = async_engine.sync_engine if settings.DATABASE_ASYNC else engine
+    pools = [pool_status('primary', primary.pool)]
+    for index, replica in enumerate(replicas.replicas):
+        replica_engine = (
+            replica.async_engine.sync_engine
+            if settings.DATABASE_ASYNC
+            else replica.engine
+        )
+        pools.append(pool_status(f'replica-{index}', replica_engine.pool))
+
+    return {'pid': os.getpid(), 'pools': pools}
+
+
+@router.get('/hashing', response_model=HashingStatus)
+def read_hashing_metrics(current_user: T_Principal):
+    # fila e latência do pool de Argon2 deste worker
+    return {'pid': os.getpid(), **hashing_executor.status()}
+
+
+@router.get('/tokens', response_model=TokenCacheStatus)
+def read_token_metrics(current_user: T_Principal):
+    # acertos e falhas do cache de tokens JWT verificados deste worker
+    return {'pid': os.getpid(), **token_cache.status()}
+
+
+@router.get('/counts', response_model=RowCounts)
+def read_row_counts(
+    session: T_Session, current_user: T_Principal, exact: bool = False
+):
+    # estimativa por padrão; exact=true faz COUNT(*) (também em cache)
+    count = row_counter.exact if exact else row_counter.estimate
+    return {
+        name: count(session, model) for name, model in COUNTED_MODELS.items()
+    }
@@ -1,40 +1,71 @@
+import json
 from http import HTTPStatus
-from typing import Annotated, List
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from task_flow.aggregation import project_documents
+from task_flow.associations import (
+    add_links,
+    has_links,
+    remove_links,
+    replace_links,
+)
+from task_flow.counting import row_counter
 from task_flow.database import get_session
-from task_flow.models import Project, Team, User
+from task_flow.loading import load_options
+from task_flow.models import Project, Team, User, projects_teams
+from task_flow.pagination import (
+    after_ranked,
+    decode_cursor,
+    decode_ranked_cursor,
+    encode_cursor,
+    keyset_page,
+)
+from task_flow.routing import SessionRoute
 from task_flow.schemas import (
+    AssociationChange,
     FilterProject,
     Message,
+    ProjectList,
     ProjectPublic,
     ProjectSchema,
     ProjectUpdateSchema,
+    TeamNames,
+    TeamPublic,
+)
+from task_flow.search import name_search
+from task_flow.security import (
+    Principal,
+    get_current_principal,
+    get_current_user,
 )
-from task_flow.security import get_current_user
 
 router = APIRouter(
     prefix='/projects',
     tags=['projects'],
+    route_class=SessionRoute,
 )
 
 T_Session = Annotated[Session, Depends(get_session)]
 # montando o objeto session
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
+# leituras: usuário autenticado em cache, sem SELECT a cada requisição
+T_Principal = Annotated[Principal, Depends(get_current_principal)]
 
 
 @router.post('/', response_model=ProjectPublic, status_code=HTTPStatus.CREATED)
 def create_project(
     projects: ProjectSchema, session: T_Session, current_user: T_CurrentUser
 ):
-    teams = (
-        session.query(Team)
-        .filter(Team.team_name.in_(projects.team_list))
-        .all()
-    )
+    teams = session.scalars(
+        select(Team)
+        .where(Team.team_name.in_(projects.team_list))
+        .options(*load_options(TeamPublic))
+    ).all()
     if len(teams) != len(projects.team_list):
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
@@ -46,42 +77,92 @@ def create_project(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
             detail='Project must have at least one team',
         )
-    db_projects = session.scalar(
-        select(Project).where((Project.project_name == projects.project_name))
+
+    # a constraint unique de project_name decide o conflito, sem SELECT
+    # prévio e sem corrida entre requisições simultâneas
+    project_id = session.scalar(
+        insert(Project)
+        .values(
+            project_name=projects.project_name,
+            current_user_id=current_user.id,
+        )
+        .on_conflict_do_nothing()
+        .returning(Project.id)
     )
 
-    if db_projects:
-        # if db_teams.team_name == teams.team_name:
+    if project_id is None:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Project already created',
         )
 
-    db_projects = Project(
-        project_name=projects.project_name, current_user_id=current_user.id
+    add_links(
+        session,
+        projects_teams.c.project_id,
+        project_id,
+        projects_teams.c.team_id,
+        [team.id for team in teams],
+    )
+    # a resposta sai do que já está em memória, antes do commit expirar
+    # os objetos da sessão
+    project = ProjectPublic(
+        id=project_id, project_name=projects.project_name, teams=teams
     )
-    db_projects.teams = teams
-
-    session.add(db_projects)
     session.commit()
-    session.refresh(db_projects)
-    return db_projects
+    return project
 
 
-@router.get('/', response_model=List[ProjectPublic])
+@router.get('/', response_model=ProjectList)
 def read_projects(
     session: T_Session,
     project_filter: Annotated[FilterProject, Query()],
-    current_user: T_CurrentUser,
+    current_user: T_Principal,
+    response: Response,
 ):
-    query = select(Project)
+    criteria, rank = [], None
+    if project_filter.include_total:
+        response.headers['X-Total-Count'] = str(
+            row_counter.estimate(session, Project)
+        )
 
     if project_filter.project_name:
-        query = query.filter(
-            Project.project_name.contains(project_filter.project_name)
+        criterion, rank = name_search(
+            Project.project_name, project_filter.project_name, project_filter
         )
+        criteria.append(criterion)
 
-    db_projects = session.scalars(query).all()
+    if project_filter.sql_aggregation:
+        if rank is None:
+            after = decode_cursor(project_filter.cursor)
+            if after is not None:
+                criteria.append(Project.id > after)
+        else:
+            after = decode_ranked_cursor(project_filter.cursor)
+            if after is not None:
+                criteria.append(after_ranked(rank, Project.id, after))
+        documents, last_id, last_rank, has_more = session.execute(
+            project_documents(*criteria, limit=project_filter.limit, rank=rank)
+        ).one()
+        if documents == '[]':
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail='Project not found',
+            )
+        next_cursor = encode_cursor(last_id, last_rank) if has_more else None
+        # o array já vem serializado do banco, só é embrulhado aqui
+        return Response(
+            f'{{"projects": {documents}, '
+            f'"next_cursor": {json.dumps(next_cursor)}}}',
+            media_type='application/json',
+            headers=response.headers,
+        )
+
+    query = (
+        select(Project).options(*load_options(ProjectPublic)).where(*criteria)
+    )
+    db_projects, next_cursor = keyset_page(
+        session, query, Project.id, project_filter, rank=rank
+    )
 
     if not db_projects:
         raise HTTPException(
@@ -89,17 +170,18 @@ def read_projects(
             detail='Project not found',
         )
 
-    return db_projects
+    return {'projects': db_projects, 'next_cursor': next_cursor}
 
 
 @router.get('/{projects_id}', response_model=ProjectPublic)
 def read_projects_with_id(
     session: T_Session,
     projects_id: int,
-    current_user: T_CurrentUser,
+    current_user: T_Principal,
 ):
-    query = select(Project).where(Project.id == projects_id)
-    project = session.scalar(query)
+    project = session.get(
+        Project, projects_id, options=load_options(ProjectPublic, many=False)
+    )
     # projects é uma lista
     if project is None:
         raise HTTPException(
@@ -148,12 +230,12 @@ def update_project(
 
     # Atualiza os times do projeto
     if project_update.team_list is not None:
-        # busca no banco os times escolhidos
-        teams = (
-            session.query(Team)
-            .filter(Team.team_name.in_(project_update.team_list))
-            .all()
-        )
+        # busca no banco os times escolhidos, já com os usuários
+        teams = session.scalars(
+            select(Team)
+            .where(Team.team_name.in_(project_update.team_list))
+            .options(*load_options(TeamPublic))
+        ).all()
         if len(teams) != len(project_update.team_list):
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND, detail='Teams not found'
@@ -163,9 +245,27 @@ def update_project(
                 status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
                 detail='Project must have at least one team',
             )
-        project.teams = teams
+        # só as linhas de projects_teams que mudam, sem carregar
+        # project.teams
+        replace_links(
+            session,
+            projects_teams.c.project_id,
+            projects_id,
+            projects_teams.c.team_id,
+            [team.id for team in teams],
+        )
+    else:
+        teams = session.scalars(
+            select(Team)
+            .join(projects_teams)
+            .where(projects_teams.c.project_id == projects_id)
+            .options(*load_options(TeamPublic))
+        ).all()
+
+    project = ProjectPublic(
+        id=projects_id, project_name=project.project_name, teams=teams
+    )
     session.commit()
-    session.refresh(project)
     return project
 
 
@@ -173,21 +273,144 @@ def update_project(
 def delete_project(
     session: T_Session, current_user: T_CurrentUser, project_id: int
 ):
-    project = session.scalar(select(Project).where(Project.id == project_id))
-
-    if not project:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Project not found'
+    # um único DELETE; projects_teams sai pelo ON DELETE CASCADE
+    deleted = session.scalar(
+        delete(Project)
+        .where(
+            Project.id == project_id,
+            Project.current_user_id == current_user.id,
         )
+        .returning(Project.id)
+    )
+
+    if deleted is None:
+        if not session.scalar(
+            select(exists().where(Project.id == project_id))
+        ):
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail='Project not found'
+            )
 
-    if project.current_user_id != current_user.id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN,
             detail='You are not allowed to delete this project. '
             'Only the project owner can perform this action.',
         )
 
-    session.delete(project)
     session.commit()
 
     return {'message': 'Project deleted successfully'}
+
+
+# >>>>>> TIMES DO PROJETO (só as linhas de projects_teams que mudam)
+
+
+def _check_project_owner(
+    session: Session, project_id: int, current_user: User
+):
+    owner_id = session.scalar(
+        select(Project.current_user_id).where(Project.id == project_id)
+    )
+    if owner_id is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Project not found'
+        )
+    if owner_id != current_user.id:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail='You are not allowed to update this project. '
+            'Only the project owner can perform this action.',
+        )
+
+
+def _team_ids(session: Session, team_names: list[str]) -> dict[int, str]:
+    names = dict(
+        session.execute(
+            select(Team.id, Team.team_name).where(
+                Team.team_name.in_(team_names)
+            )
+        ).all()
+    )
+    if len(names) != len(set(team_names)):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Teams not found'
+        )
+    return names
+
+
+def _add_teams(session, current_user, project_id, team_names):
+    _check_project_owner(session, project_id, current_user)
+    names = _team_ids(session, team_names)
+    added = add_links(
+        session,
+        projects_teams.c.project_id,
+        project_id,
+        projects_teams.c.team_id,
+        list(names),
+    )
+    session.commit()
+    return {'changed': [names[team_id] for team_id in added]}
+
+
+def _remove_teams(session, current_user, project_id, team_names):
+    _check_project_owner(session, project_id, current_user)
+    names = _team_ids(session, team_names)
+    removed = remove_links(
+        session,
+        projects_teams.c.project_id,
+        project_id,
+        projects_teams.c.team_id,
+        list(names),
+    )
+    if not has_links(session, projects_teams.c.project_id, project_id):
+        session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail='Project must have at least one team',
+        )
+    session.commit()
+    return {'changed': [names[team_id] for team_id in removed]}
+
+
+@router.post('/{project_id}/teams', response_model=AssociationChange)
+def add_project_teams(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    project_id: int,
+    teams: TeamNames,
+):
+    return _add_teams(session, current_user, project_id, teams.team_names)
+
+
+@router.post(
+    '/{project_id}/teams/{team_name}', response_model=AssociationChange
+)
+def add_project_team(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    project_id: int,
+    team_name: str,
+):
+    return _add_teams(session, current_user, project_id, [team_name])
+
+
+@router.delete('/{project_id}/teams', response_model=AssociationChange)
+def remove_project_teams(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    project_id: int,
+    teams: TeamNames,
+):
+    return _remove_teams(session, current_user, project_id, teams.team_names)
+
+
+@router.delete(
+    '/{project_id}/teams/{team_name}', response_model=AssociationChange
+)
+def remove_project_team(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    project_id: int,
+    team_name: str,
+):
+    return _remove_teams(session, current_user, project_id, [team_name])
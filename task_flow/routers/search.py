@@ -0,0 +1,50 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from task_flow.database import get_session
+from task_flow.routing import SessionRoute
+from task_flow.schemas import FullTextQuery, SearchResults
+from task_flow.search import (
+    encode_search_cursor,
+    prefix_tsquery,
+    search_facets,
+    search_page,
+)
+from task_flow.security import Principal, get_current_principal
+
+router = APIRouter(prefix='/search', tags=['search'], route_class=SessionRoute)
+
+T_Session = Annotated[Session, Depends(get_session)]
+# leituras: usuário autenticado em cache, sem SELECT a cada requisição
+T_Principal = Annotated[Principal, Depends(get_current_principal)]
+
+
+@router.get('/', response_model=SearchResults)
+def search(
+    session: T_Session,
+    search_query: Annotated[FullTextQuery, Query()],
+    current_user: T_Principal,
+):
+    tsquery = prefix_tsquery(search_query.q)
+    if tsquery is None:
+        # nenhuma palavra pesquisável (só pontuação, por exemplo)
+        return {'results': [], 'facets': {}, 'next_cursor': None}
+
+    facets = dict(session.execute(search_facets(tsquery)).all())
+    hits = session.execute(
+        search_page(
+            tsquery,
+            search_query.types,
+            search_query.limit,
+            search_query.cursor,
+        )
+    ).all()
+
+    next_cursor = None
+    if len(hits) > search_query.limit:
+        hits = hits[: search_query.limit]
+        next_cursor = encode_search_cursor(hits[-1])
+
+    return {'results': hits, 'facets': facets, 'next_cursor': next_cursor}
@@ -1,76 +1,114 @@
 from http import HTTPStatus
-from typing import Annotated, List
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from task_flow.associations import (
+    add_links,
+    has_links,
+    remove_links,
+    replace_links,
+)
+from task_flow.counting import row_counter
 from task_flow.database import get_session
-from task_flow.models import Team, User
+from task_flow.loading import load_options
+from task_flow.models import Team, User, teams_users
+from task_flow.pagination import keyset_page
+from task_flow.routing import SessionRoute
 from task_flow.schemas import (
+    AssociationChange,
     FilterTeam,
     Message,
+    TeamList,
     TeamPublic,
     TeamSchema,
     TeamUpdateSchema,
+    UserNames,
+)
+from task_flow.search import name_search
+from task_flow.security import (
+    Principal,
+    get_current_principal,
+    get_current_user,
 )
-from task_flow.security import get_current_user
 
 router = APIRouter(
     prefix='/teams',
     tags=['teams'],
+    route_class=SessionRoute,
 )
 
 T_Session = Annotated[Session, Depends(get_session)]
 # montando o objeto session
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
+# leituras: usuário autenticado em cache, sem SELECT a cada requisição
+T_Principal = Annotated[Principal, Depends(get_current_principal)]
 
 
 @router.post('/', response_model=TeamPublic, status_code=HTTPStatus.CREATED)
 def create_teams(
     teams: TeamSchema, session: T_Session, current_user: T_CurrentUser
 ):
-    users = (
-        session.query(User).filter(User.username.in_(teams.user_list)).all()
-    )
+    users = session.scalars(
+        select(User).where(User.username.in_(teams.user_list))
+    ).all()
     if len(users) != len(teams.user_list):
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='One or more users do not exist',
         )
 
-    db_teams = session.scalar(
-        select(Team).where((Team.team_name == teams.team_name))
+    # a constraint unique de team_name decide o conflito, sem SELECT
+    # prévio e sem corrida entre requisições simultâneas
+    team_id = session.scalar(
+        insert(Team)
+        .values(team_name=teams.team_name, current_user_id=current_user.id)
+        .on_conflict_do_nothing()
+        .returning(Team.id)
     )
 
-    if db_teams:
-        # if db_teams.team_name == teams.team_name:
+    if team_id is None:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Team already created',
         )
 
-    db_teams = Team(team_name=teams.team_name, current_user_id=current_user.id)
-    db_teams.users = users
-
-    session.add(db_teams)
+    add_links(
+        session,
+        teams_users.c.team_id,
+        team_id,
+        teams_users.c.user_id,
+        [user.id for user in users],
+    )
+    # a resposta sai do que já está em memória, antes do commit expirar
+    # os objetos da sessão
+    team = TeamPublic(id=team_id, team_name=teams.team_name, users=users)
     session.commit()
-    session.refresh(db_teams)
-    return db_teams
+    return team
 
 
-@router.get('/', response_model=List[TeamPublic])
+@router.get('/', response_model=TeamList)
 def read_teams(
     session: T_Session,
     team_filter: Annotated[FilterTeam, Query()],
-    current_user: T_CurrentUser,
+    current_user: T_Principal,
+    response: Response,
 ):
-    query = select(Team)
+    query = select(Team).options(*load_options(TeamPublic))
 
+    rank = None
     if team_filter.team_name:
-        query = query.filter(Team.team_name.contains(team_filter.team_name))
+        criterion, rank = name_search(
+            Team.team_name, team_filter.team_name, team_filter
+        )
+        query = query.filter(criterion)
 
-    db_teams = session.scalars(query).all()
+    db_teams, next_cursor = keyset_page(
+        session, query, Team.id, team_filter, rank=rank
+    )
 
     if not db_teams:  # Lista vazia é False
         raise HTTPException(
@@ -78,15 +116,21 @@ def read_teams(
             detail='Team not found',
         )
 
-    return db_teams
+    if team_filter.include_total:
+        response.headers['X-Total-Count'] = str(
+            row_counter.estimate(session, Team)
+        )
+
+    return {'teams': db_teams, 'next_cursor': next_cursor}
 
 
 @router.get('/{team_id}', response_model=TeamPublic)
 def read_teams_with_id(
-    session: T_Session, current_user: T_CurrentUser, team_id: int
+    session: T_Session, current_user: T_Principal, team_id: int
 ):
-    query = select(Team).where(Team.id == team_id)
-    teams = session.scalar(query)
+    teams = session.get(
+        Team, team_id, options=load_options(TeamPublic, many=False)
+    )
 
     if teams is None:
         raise HTTPException(
@@ -134,11 +178,9 @@ def update_team(
 
     # Atualiza os usuários do time
     if team_update.user_list is not None:
-        users = (
-            session.query(User)
-            .filter(User.username.in_(team_update.user_list))
-            .all()
-        )
+        users = session.scalars(
+            select(User).where(User.username.in_(team_update.user_list))
+        ).all()
         if len(users) != len(team_update.user_list):
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
@@ -149,30 +191,159 @@ def update_team(
                 status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
                 detail='Team must have at least one user',
             )
-        team.users = users
-
+        # só as linhas de teams_users que mudam, sem carregar team.users
+        replace_links(
+            session,
+            teams_users.c.team_id,
+            team_id,
+            teams_users.c.user_id,
+            [user.id for user in users],
+        )
+    else:
+        users = session.scalars(
+            select(User)
+            .join(teams_users)
+            .where(teams_users.c.team_id == team_id)
+        ).all()
+
+    # Sempre retorne o objeto atualizado, montado antes do commit
+    team = TeamPublic(id=team_id, team_name=team.team_name, users=users)
     session.commit()
-    session.refresh(team)
-    return team  # Sempre retorne o objeto atualizado
+    return team
 
 
 @router.delete('/{team_id}', response_model=Message)
 def delete_team(session: T_Session, current_user: T_CurrentUser, team_id: int):
-    team = session.scalar(select(Team).where(Team.id == team_id))
+    # um único DELETE; teams_users e projects_teams saem pelo ON DELETE
+    # CASCADE, sem carregar as coleções do time
+    deleted = session.scalar(
+        delete(Team)
+        .where(Team.id == team_id, Team.current_user_id == current_user.id)
+        .returning(Team.id)
+    )
 
-    if not team:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Team not found'
-        )
+    if deleted is None:
+        if not session.scalar(select(exists().where(Team.id == team_id))):
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail='Team not found'
+            )
 
-    if team.current_user_id != current_user.id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN,
             detail='You are not allowed to delete this team. '
             'Only the team owner can perform this action.',
         )
 
-    session.delete(team)
     session.commit()
 
     return {'message': 'Team deleted successfully'}
+
+
+# >>>>>> MEMBROS DO TIME (só as linhas de teams_users que mudam)
+
+
+def _check_team_owner(session: Session, team_id: int, current_user: User):
+    owner_id = session.scalar(
+        select(Team.current_user_id).where(Team.id == team_id)
+    )
+    if owner_id is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Team not found',
+        )
+    if owner_id != current_user.id:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail='You are not allowed to update this team. '
+            'Only the team owner can perform this action.',
+        )
+
+
+def _user_ids(session: Session, usernames: list[str]) -> dict[int, str]:
+    names = dict(
+        session.execute(
+            select(User.id, User.username).where(User.username.in_(usernames))
+        ).all()
+    )
+    if len(names) != len(set(usernames)):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Users not found',
+        )
+    return names
+
+
+def _add_members(session, current_user, team_id, usernames):
+    _check_team_owner(session, team_id, current_user)
+    names = _user_ids(session, usernames)
+    added = add_links(
+        session,
+        teams_users.c.team_id,
+        team_id,
+        teams_users.c.user_id,
+        list(names),
+    )
+    session.commit()
+    return {'changed': [names[user_id] for user_id in added]}
+
+
+def _remove_members(session, current_user, team_id, usernames):
+    _check_team_owner(session, team_id, current_user)
+    names = _user_ids(session, usernames)
+    removed = remove_links(
+        session,
+        teams_users.c.team_id,
+        team_id,
+        teams_users.c.user_id,
+        list(names),
+    )
+    if not has_links(session, teams_users.c.team_id, team_id):
+        session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail='Team must have at least one user',
+        )
+    session.commit()
+    return {'changed': [names[user_id] for user_id in removed]}
+
+
+@router.post('/{team_id}/members', response_model=AssociationChange)
+def add_team_members(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    team_id: int,
+    members: UserNames,
+):
+    return _add_members(session, current_user, team_id, members.usernames)
+
+
+@router.post('/{team_id}/members/{username}', response_model=AssociationChange)
+def add_team_member(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    team_id: int,
+    username: str,
+):
+    return _add_members(session, current_user, team_id, [username])
+
+
+@router.delete('/{team_id}/members', response_model=AssociationChange)
+def remove_team_members(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    team_id: int,
+    members: UserNames,
+):
+    return _remove_members(session, current_user, team_id, members.usernames)
+
+
+@router.delete(
+    '/{team_id}/members/{username}', response_model=AssociationChange
+)
+def remove_team_member(
+    session: T_Session,
+    current_user: T_CurrentUser,
+    team_id: int,
+    username: str,
+):
+    return _remove_members(session, current_user, team_id, [username])
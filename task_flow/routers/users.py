@@ -1,14 +1,22 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import ValidationError
+from sqlalchemy import case, delete, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from task_flow.counting import row_counter
 from task_flow.database import get_session
 from task_flow.models import User
+from task_flow.pagination import keyset_page
+from task_flow.routing import SessionRoute
 from task_flow.schemas import (
     Message,
+    PageParams,
+    UserBulk,
+    UserBulkResult,
     UserList,
     UserPublic,
     UserSchema,
@@ -16,18 +24,30 @@ from task_flow.schemas import (
 from task_flow.security import (
     get_current_user,
     get_password_hash,
+    get_password_hashes,
+    principal_cache,
 )
 
-router = APIRouter(prefix='/users', tags=['users'])
+router = APIRouter(prefix='/users', tags=['users'], route_class=SessionRoute)
 
 T_Session = Annotated[Session, Depends(get_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
 @router.get('/', response_model=UserList)
-def read_users(session: T_Session, limit: int = 10, skip: int = 0):
-    user = session.scalars(select(User).limit(limit).offset(skip)).all()
-    return {'users': user}
+def read_users(
+    session: T_Session,
+    page: Annotated[PageParams, Query()],
+    response: Response,
+):
+    user, next_cursor = keyset_page(session, select(User), User.id, page)
+
+    if page.include_total:
+        response.headers['X-Total-Count'] = str(
+            row_counter.estimate(session, User)
+        )
+
+    return {'users': user, 'next_cursor': next_cursor}
 
 
 @router.get('/{user_id}', response_model=UserPublic)
@@ -44,38 +64,144 @@ def read_user_with_id(user_id: int, session: T_Session):
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
 def create_users(user: UserSchema, session: T_Session):
-    db_user = session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
+    # as constraints unique decidem o conflito em um único statement, o
+    # que também vale para cadastros simultâneos
+    db_user = session.execute(
+        insert(User)
+        .values(
+            username=user.username,
+            password=get_password_hash(user.password),
+            email=user.email,
         )
-    )
+        .on_conflict_do_nothing()
+        .returning(User.id, User.username, User.email)
+    ).first()
 
-    if db_user:
-        if db_user.username == user.username:
+    if db_user is None:
+        username_taken = session.scalar(
+            select(exists().where(User.username == user.username))
+        )
+        if username_taken:
             raise HTTPException(
                 status_code=HTTPStatus.CONFLICT,
                 detail='Username already registered',
             )
 
-        if db_user.email == user.email:
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail='Email already registered',
-            )
-
-    db_user = User(
-        username=user.username,
-        password=get_password_hash(user.password),
-        email=user.email,
-    )
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Email already registered',
+        )
 
-    session.add(db_user)
     session.commit()
-    session.refresh(db_user)
 
     return db_user
 
 
+def _validation_detail(error: ValidationError) -> str:
+    return '; '.join(
+        f'{".".join(map(str, item["loc"]))}: {item["msg"]}'
+        for item in error.errors()
+    )
+
+
+def _parse_bulk_items(items: list) -> tuple[dict, dict]:
+    """Valida cada item do lote; devolve os usuários e os erros por índice.
+
+    Além do UserSchema, recusa username ausente e username ou email
+    repetidos dentro do próprio lote.
+    """
+    users, errors = {}, {}
+    usernames, emails = set(), set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = 'Item must be an object'
+            continue
+        try:
+            user = UserSchema.model_validate(item)
+        except ValidationError as error:
+            errors[index] = _validation_detail(error)
+            continue
+        if user.username is None:
+            errors[index] = 'Username is required'
+        elif user.username in usernames:
+            errors[index] = 'Username repeated in batch'
+        elif user.email in emails:
+            errors[index] = 'Email repeated in batch'
+        else:
+            users[index] = user
+        usernames.add(user.username)
+        emails.add(user.email)
+    return users, errors
+
+
+@router.post('/bulk', response_model=UserBulkResult)
+def create_users_bulk(batch: UserBulk, session: T_Session):
+    """Cadastra um lote de usuários, com os erros reportados por item.
+
+    Os conflitos são checados em uma única consulta, os hashes rodam em
+    paralelo no pool de processos e os usuários aceitos entram em um
+    único INSERT de várias linhas com RETURNING.
+    """
+    users, errors = _parse_bulk_items(batch.users)
+    usernames = {user.username for user in users.values()}
+    emails = {user.email for user in users.values()}
+
+    registered = session.execute(
+        select(User.username, User.email).where(
+            User.username.in_(usernames) | User.email.in_(emails)
+        )
+    ).all()
+    registered_usernames = {row.username for row in registered}
+    registered_emails = {row.email for row in registered}
+
+    accepted = {}
+    for index, user in users.items():
+        if user.username in registered_usernames:
+            errors[index] = 'Username already registered'
+        elif user.email in registered_emails:
+            errors[index] = 'Email already registered'
+        else:
+            accepted[index] = user
+
+    created = {}
+    if accepted:
+        hashes = get_password_hashes([
+            user.password for user in accepted.values()
+        ])
+        # ON CONFLICT cobre cadastros concorrentes feitos após a checagem
+        rows = session.execute(
+            insert(User)
+            .values([
+                {
+                    'username': user.username,
+                    'email': user.email,
+                    'password': password,
+                }
+                for user, password in zip(accepted.values(), hashes)
+            ])
+            .on_conflict_do_nothing()
+            .returning(User.id, User.username, User.email)
+        ).all()
+        session.commit()
+        created = {row.username: row for row in rows}
+
+    for index, user in accepted.items():
+        if user.username not in created:
+            errors[index] = 'Username or email already registered'
+
+    return {
+        'created': [
+            created[user.username]
+            for user in accepted.values()
+            if user.username in created
+        ],
+        'errors': [
+            {'index': index, 'detail': detail}
+            for index, detail in sorted(errors.items())
+        ],
+    }
+
+
 # PENDENTE: TENTAR COLOCAR ID INVALIDO
 @router.put('/{user_id}', response_model=UserPublic)
 def update_user(
@@ -90,15 +216,26 @@ def update_user(
             detail='You are not allowed to edit this user',
         )
 
-    current_user.username = user.username
-    current_user.password = get_password_hash(user.password)
-    current_user.email = user.email
-
-    session.add(current_user)
+    # o RETURNING já traz a resposta: nada é relido depois do commit
+    db_user = session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            username=user.username,
+            password=get_password_hash(user.password),
+            email=user.email,
+            # trocar o email revoga os tokens já emitidos
+            token_version=case(
+                (User.email != user.email, User.token_version + 1),
+                else_=User.token_version,
+            ),
+        )
+        .returning(User.id, User.username, User.email)
+    ).one()
     session.commit()
-    session.refresh(current_user)
+    principal_cache.pop(user_id)
 
-    return current_user
+    return db_user
 
 
 @router.delete('/{user_id}', response_model=Message)
@@ -113,7 +250,9 @@ def delete_user(
             detail='You are not allowed to delete this user',
         )
 
-    session.delete(current_user)
+    # teams_users sai pelo ON DELETE CASCADE, sem carregar user.teams
+    session.execute(delete(User).where(User.id == user_id))
     session.commit()
+    principal_cache.pop(user_id)
 
     return {'message': 'User deleted successfully'}
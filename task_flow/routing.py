@@ -0,0 +1,131 @@
+import inspect
+from functools import wraps
+from typing import Annotated, get_args, get_origin
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.params import Depends
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from task_flow.database import get_async_session, get_session
+from task_flow.security import (
+    get_current_principal,
+    get_current_principal_async,
+    get_current_user,
+    get_current_user_async,
+)
+from task_flow.settings import Settings
+
+settings = Settings()
+
+# dependências síncronas e suas equivalentes no modo assíncrono
+ASYNC_DEPENDENCIES = {
+    get_session: get_async_session,
+    get_current_user: get_current_user_async,
+    get_current_principal: get_current_principal_async,
+}
+
+
+def _async_depends(depends: Depends) -> Depends:
+    return Depends(
+        ASYNC_DEPENDENCIES[depends.dependency], use_cache=depends.use_cache
+    )
+
+
+def _is_sync_dependency(value) -> bool:
+    return (
+        isinstance(value, Depends) and value.dependency in ASYNC_DEPENDENCIES
+    )
+
+
+def _async_parameter(parameter: inspect.Parameter) -> inspect.Parameter:
+    annotation, default = parameter.annotation, parameter.default
+
+    if get_origin(annotation) is Annotated:
+        base, *metadata = get_args(annotation)
+        dependencies = [
+            item.dependency for item in metadata if _is_sync_dependency(item)
+        ]
+        if dependencies:
+            if get_session in dependencies:
+                base = AsyncSession
+            metadata = [
+                _async_depends(item) if _is_sync_dependency(item) else item
+                for item in metadata
+            ]
+            annotation = Annotated[base, *metadata]
+
+    if _is_sync_dependency(default):
+        default = _async_depends(default)
+
+    return parameter.replace(annotation=annotation, default=default)
+
+
+def _session_parameter(signature: inspect.Signature) -> str | None:
+    for name, parameter in signature.parameters.items():
+        if get_origin(parameter.annotation) is Annotated and any(
+            isinstance(item, Depends) and item.dependency is get_session
+            for item in get_args(parameter.annotation)[1:]
+        ):
+            return name
+    return None
+
+
+def run_in_async_session(endpoint, response_model=None):
+    """Converte um endpoint síncrono em uma corrotina.
+
+    O corpo do endpoint roda via ``AsyncSession.run_sync``: o código
+    continua síncrono, mas cada chamada ao banco é aguardada no event loop
+    em vez de ocupar uma thread do threadpool. A resposta é validada ainda
+    dentro da sessão para que os relacionamentos lazy possam ser carregados.
+    """
+    # include_router recria as rotas, então o endpoint pode já ser async
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    signature = inspect.signature(endpoint)
+    session_name = _session_parameter(signature)
+    adapter = (
+        None
+        if response_model is None
+        or isinstance(response_model, DefaultPlaceholder)
+        else TypeAdapter(response_model)
+    )
+
+    @wraps(endpoint)
+    async def wrapper(**kwargs):
+        if session_name is None:
+            return endpoint(**kwargs)
+
+        def call(sync_session):
+            result = endpoint(**{**kwargs, session_name: sync_session})
+            if adapter is None or isinstance(result, Response):
+                return result
+            return adapter.validate_python(result, from_attributes=True)
+
+        return await kwargs[session_name].run_sync(call)
+
+    wrapper.__signature__ = signature.replace(
+        parameters=[
+            _async_parameter(parameter)
+            for parameter in signature.parameters.values()
+        ]
+    )
+    return wrapper
+
+
+class AsyncSessionRoute(APIRoute):
+    """Rota que executa o endpoint sobre uma AsyncSession."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(
+            path,
+            run_in_async_session(endpoint, kwargs.get('response_model')),
+            **kwargs,
+        )
+
+
+# classe de rota usada por todos os routers, escolhida pelo Settings
+SessionRoute = AsyncSessionRoute if settings.DATABASE_ASYNC else APIRoute
@@ -1,6 +1,6 @@
-from typing import List
+from typing import Any, List, Literal
 
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 from task_flow.settings import Settings
 
@@ -34,13 +34,39 @@ class UserPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserBulk(BaseModel):
+    # itens crus: cada um é validado como UserSchema no endpoint, para que
+    # um item inválido (mesmo um que nem é objeto) vire um erro do item e
+    # não um 422 do lote inteiro
+    users: list[Any] = Field(
+        min_length=1, max_length=settings.BULK_USERS_MAX_ITEMS
+    )
+
+
+class BulkItemError(BaseModel):
+    index: int  # posição do item no lote enviado
+    detail: str
+
+
+class UserBulkResult(BaseModel):
+    created: list[UserPublic]
+    errors: list[BulkItemError]
+
+
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
     access_token: str  # o teoken JWT que vamos gerar
     token_type: str  # o modelo que o cliente deve usar para Autorização
+    # opaco e de uso único: trocado por um novo a cada /auth/refresh_token
+    refresh_token: str
+
+
+class RefreshTokenSchema(BaseModel):
+    refresh_token: str
 
 
 class TeamSchema(BaseModel):
@@ -52,6 +78,7 @@ class TeamPublic(BaseModel):
     id: int
     team_name: str
     users: List[UserPublic]
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TeamUpdateSchema(BaseModel):
@@ -59,7 +86,42 @@ class TeamUpdateSchema(BaseModel):
     user_list: list[str] | None = None
 
 
-class FilterTeam(BaseModel):
+class UserNames(BaseModel):
+    usernames: list[str] = Field(min_length=1)
+
+
+class AssociationChange(BaseModel):
+    # nomes efetivamente adicionados/removidos (já presentes ficam de fora)
+    changed: list[str]
+
+
+class TeamList(BaseModel):
+    teams: List[TeamPublic]
+    next_cursor: str | None
+
+
+class CursorParams(BaseModel):
+    limit: int = Field(
+        settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE
+    )
+    cursor: str | None = None
+
+
+class PageParams(CursorParams):
+    # devolve X-Total-Count (total da coleção, sem filtros) de uma
+    # estimativa em cache
+    include_total: bool = False
+
+
+class SearchParams(PageParams):
+    # contains: LIKE '%x%' na ordem dos ids; similar: operador % do
+    # pg_trgm, ordenado pela similaridade. Os dois usam o índice GIN.
+    match: Literal['contains', 'similar'] = 'contains'
+    # ILIKE no modo contains (similar já ignora maiúsculas)
+    case_insensitive: bool = False
+
+
+class FilterTeam(SearchParams):
     team_name: str | None = None
 
 
@@ -74,10 +136,92 @@ class ProjectPublic(BaseModel):
     teams: List[TeamPublic]
 
 
-class FilterProject(BaseModel):
+class TeamNames(BaseModel):
+    team_names: list[str] = Field(min_length=1)
+
+
+class ProjectList(BaseModel):
+    projects: List[ProjectPublic]
+    next_cursor: str | None
+
+
+class FilterProject(SearchParams):
     project_name: str | None = None
+    # monta o JSON no Postgres, sem ORM nem Pydantic (tenants grandes)
+    sql_aggregation: bool = False
 
 
 class ProjectUpdateSchema(BaseModel):
     project_name: str | None = None
     team_list: list[str] | None = None
+
+
+SearchType = Literal['users', 'teams', 'projects']
+
+
+class FullTextQuery(CursorParams):
+    q: str = Field(min_length=1)
+    types: list[SearchType] = ['users', 'teams', 'projects']
+
+
+class SearchHit(BaseModel):
+    type: SearchType
+    id: int
+    name: str
+    rank: float
+
+
+class SearchFacets(BaseModel):
+    # total de resultados de cada tipo, independente de ``types``
+    users: int = 0
+    teams: int = 0
+    projects: int = 0
+
+
+class SearchResults(BaseModel):
+    results: list[SearchHit]
+    facets: SearchFacets
+    next_cursor: str | None
+
+
+class PoolStatus(BaseModel):
+    name: str
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    waits: int
+    wait_time_avg_ms: float
+    wait_time_max_ms: float
+    timeouts: int
+
+
+class PoolStatusList(BaseModel):
+    pid: int
+    pools: list[PoolStatus]
+
+
+class HashingStatus(BaseModel):
+    pid: int
+    workers: int
+    pending: int
+    max_pending: int
+    completed: int
+    rejected: int
+    latency_avg_ms: float
+    latency_max_ms: float
+
+
+class TokenCacheStatus(BaseModel):
+    pid: int
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+
+class RowCounts(BaseModel):
+    users: int
+    teams: int
+    projects: int
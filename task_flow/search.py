@@ -0,0 +1,119 @@
+import binascii
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from sqlalchemy import (
+    REAL,
+    Select,
+    and_,
+    cast,
+    func,
+    literal,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from task_flow.models import Project, Team, User
+from task_flow.pagination import invalid_cursor
+
+# tipo de resultado → (modelo, coluna com o nome exibido)
+SEARCHABLE_MODELS = {
+    'users': (User, User.username),
+    'teams': (Team, Team.team_name),
+    'projects': (Project, Project.project_name),
+}
+
+# palavras da busca; '_' separa palavras como no parser do Postgres
+SEARCH_TERM = re.compile(r'[^\W_]+')
+
+
+def name_search(column, term: str, search):
+    """Critério de busca por nome e, no modo similar, o rank de cada linha.
+
+    Os dois modos são atendidos pelo índice GIN de trigramas da coluna:
+    ``contains`` vira LIKE/ILIKE '%termo%' e ``similar`` usa o operador
+    ``%`` do pg_trgm, ordenando pela ``similarity`` do nome com o termo.
+    """
+    if search.match == 'similar':
+        rank = func.similarity(column, term, type_=REAL)
+        return column.op('%')(term), rank
+    if search.case_insensitive:
+        return column.icontains(term, autoescape=True), None
+    return column.contains(term, autoescape=True), None
+
+
+def prefix_tsquery(text: str) -> str | None:
+    """'road ma' → 'road:* & ma:*' (todas as palavras, por prefixo).
+
+    Só as palavras do texto entram na consulta, então operadores do
+    to_tsquery digitados pelo cliente não chegam ao Postgres.
+    """
+    terms = SEARCH_TERM.findall(text)
+    return ' & '.join(f'{term}:*' for term in terms) or None
+
+
+def search_matches(tsquery: str, types):
+    """UNION ALL das linhas de ``types`` cujo search_vector casa a busca."""
+    query = func.to_tsquery(cast('simple', REGCONFIG), tsquery)
+    return union_all(*[
+        select(
+            literal(kind).label('type'),
+            model.id,
+            name.label('name'),
+            func.ts_rank(model.search_vector, query, type_=REAL).label('rank'),
+        ).where(model.search_vector.op('@@')(query))
+        for kind, (model, name) in SEARCHABLE_MODELS.items()
+        if kind in types
+    ]).subquery()
+
+
+def search_facets(tsquery: str) -> Select:
+    matches = search_matches(tsquery, SEARCHABLE_MODELS)
+    return select(matches.c.type, func.count()).group_by(matches.c.type)
+
+
+def search_page(tsquery: str, types, limit: int, cursor: str | None):
+    """Página da busca na ordem (rank DESC, tipo, id), uma linha a mais."""
+    matches = search_matches(tsquery, types)
+    query = select(matches)
+
+    after = decode_search_cursor(cursor)
+    if after is not None:
+        last_rank, last_type, last_id = after
+        last_rank = cast(last_rank, REAL)
+        query = query.where(
+            or_(
+                matches.c.rank < last_rank,
+                and_(
+                    matches.c.rank == last_rank,
+                    or_(
+                        matches.c.type > last_type,
+                        and_(
+                            matches.c.type == last_type,
+                            matches.c.id > last_id,
+                        ),
+                    ),
+                ),
+            )
+        )
+
+    return query.order_by(
+        matches.c.rank.desc(), matches.c.type, matches.c.id
+    ).limit(limit + 1)
+
+
+def encode_search_cursor(hit) -> str:
+    value = f'{hit.rank!r}:{hit.type}:{hit.id}'
+    return urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_search_cursor(cursor: str | None):
+    if cursor is None:
+        return None
+    try:
+        rank, kind, last_id = urlsafe_b64decode(cursor.encode()).split(b':')
+        return float(rank), kind.decode(), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid_cursor()
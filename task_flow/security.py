@@ -1,32 +1,98 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import Annotated
+from uuid import uuid4
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
-from jwt.exceptions import ExpiredSignatureError, PyJWTError
-from pwdlib import PasswordHash
+from jwt.exceptions import PyJWTError
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from task_flow.database import get_session
+from task_flow.cache import TTLCache
+from task_flow.database import get_async_session, get_session
+from task_flow.hashing import (
+    HashingSaturated,
+    hash_password,
+    hash_passwords,
+    hashing_executor,
+    verify_and_update_hash,
+    verify_password_hash,
+)
 from task_flow.models import User
+from task_flow.revocation import revocation_list
 from task_flow.settings import Settings
+from task_flow.tokens import token_cache
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 settings = Settings()
 T_Session = Annotated[Session, Depends(get_session)]
+T_AsyncSession = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuário autenticado, sem vínculo com a sessão do banco."""
+
+    id: int
+    username: str
+    email: str
+    token_version: int
+
+
+# principal por id do usuário; cada worker tem o seu, então uma
+# alteração feita em outro worker só aparece depois do TTL
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+PRINCIPAL_COLUMNS = (User.id, User.username, User.email, User.token_version)
+
+
+def hashing_unavailable():
+    return HTTPException(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        detail='Too many password operations, try again later',
+        headers={'Retry-After': str(settings.HASHING_RETRY_AFTER)},
+    )
 
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    try:
+        return hashing_executor.run(hash_password, password)
+    except HashingSaturated:
+        raise hashing_unavailable()
+
+
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    try:
+        return hash_passwords(passwords)
+    except HashingSaturated:
+        raise hashing_unavailable()
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return hashing_executor.run(
+            verify_password_hash, plain_password, hashed_password
+        )
+    except HashingSaturated:
+        raise hashing_unavailable()
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Como verify_password, mais o hash novo se o custo do Argon2 mudou."""
+    try:
+        return hashing_executor.run(
+            verify_and_update_hash, plain_password, hashed_password
+        )
+    except HashingSaturated:
+        raise hashing_unavailable()
 
 
 # data é um dicionário com os dados do usuário
@@ -37,8 +103,8 @@ def create_access_token(data: dict):
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    # exp é uma Claim padrão do JWT
-    to_encode.update({'exp': expire})
+    # exp é uma Claim padrão do JWT; o jti identifica o token na revogação
+    to_encode.update({'exp': expire, 'jti': uuid4().hex})
     encoded_jwt = encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -46,34 +112,131 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_user(
-    session: T_Session,
-    token: str = Depends(oauth2_scheme),
-):
-    credentials_exception = HTTPException(
+def invalid_credentials():
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Credenciais inválidas',
         headers={'WWW-Authenticate': 'Bearer'},
     )
+
+
+def decode_token(token: str) -> dict:
+    """Claims do token JWT, verificando a assinatura só uma vez por token."""
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        # o ExpiredSignatureError é uma exceção encapsulada do PyJWTError:
+        # token expirado ou inválido não pode mais ser usado
+        except PyJWTError:
+            raise invalid_credentials()
+        token_cache.set(token, claims)
+    return claims
+
+
+def token_claims(user: User) -> dict:
+    """Claims que identificam o usuário no token.
+
+    O sub é o id, para a busca ser pela chave primária; o token_version
+    permite revogar todos os tokens do usuário incrementando a coluna.
+    """
+    return {'sub': str(user.id), 'token_version': user.token_version}
+
+
+def get_token_identity(token: str) -> tuple[int, int, str]:
+    """Valida o token JWT e retorna o id do usuário, a versão e o jti."""
+    claims = decode_token(token)
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        username: str = payload.get('sub')
-        if not username:
-            raise credentials_exception
+        user_id = int(claims['sub'])
+        token_version = int(claims['token_version'])
+        jti = claims['jti']
+    except (KeyError, TypeError, ValueError):
+        raise invalid_credentials()
+    if not isinstance(jti, str):
+        raise invalid_credentials()
+    return user_id, token_version, jti
+
+
+def get_current_user(
+    session: T_Session,
+    token: str = Depends(oauth2_scheme),
+):
+    user_id, token_version, jti = get_token_identity(token)
+    if revocation_list.is_revoked(session, jti):
+        raise invalid_credentials()
+    # busca pela chave primária: usa o identity map da sessão
+    user = session.get(User, user_id)
+
+    if not user or user.token_version != token_version:
+        raise invalid_credentials()
 
-    except ExpiredSignatureError:
-        # o ExpiredSignatureError é uma exceção encapsulada do PyJWTError
-        # o token expirou, então a gente não pode usar mais ele
-        raise credentials_exception
+    return user
 
-    except PyJWTError:
-        raise credentials_exception
 
-    user = session.scalar(select(User).where(User.email == username))
+async def get_current_user_async(
+    session: T_AsyncSession,
+    token: str = Depends(oauth2_scheme),
+):
+    user_id, token_version, jti = get_token_identity(token)
+    if await session.run_sync(revocation_list.is_revoked, jti):
+        raise invalid_credentials()
+    user = await session.get(User, user_id)
 
-    if not user:
-        raise credentials_exception
+    if not user or user.token_version != token_version:
+        raise invalid_credentials()
 
     return user
+
+
+def get_current_principal(
+    session: T_Session,
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """Usuário autenticado para rotas de leitura, com cache por id.
+
+    Evita o SELECT do usuário a cada requisição. Rotas de escrita usam
+    get_current_user, que sempre lê o usuário na sessão da requisição.
+    """
+    user_id, token_version, jti = get_token_identity(token)
+    if revocation_list.is_revoked(session, jti):
+        raise invalid_credentials()
+    principal = principal_cache.get(user_id)
+    # versão diferente no cache: pode ser o cache que está desatualizado
+    if principal is None or principal.token_version != token_version:
+        row = session.execute(
+            select(*PRINCIPAL_COLUMNS).where(User.id == user_id)
+        ).first()
+        if not row:
+            raise invalid_credentials()
+        principal = Principal(*row)
+        principal_cache.set(user_id, principal)
+
+    if principal.token_version != token_version:
+        raise invalid_credentials()
+    return principal
+
+
+async def get_current_principal_async(
+    session: T_AsyncSession,
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    user_id, token_version, jti = get_token_identity(token)
+    if await session.run_sync(revocation_list.is_revoked, jti):
+        raise invalid_credentials()
+    principal = principal_cache.get(user_id)
+    if principal is None or principal.token_version != token_version:
+        row = (
+            await session.execute(
+                select(*PRINCIPAL_COLUMNS).where(User.id == user_id)
+            )
+        ).first()
+        if not row:
+            raise invalid_credentials()
+        principal = Principal(*row)
+        principal_cache.set(user_id, principal)
+
+    if principal.token_version != token_version:
+        raise invalid_credentials()
+    return principal
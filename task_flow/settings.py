@@ -7,7 +7,57 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    # True faz os routers rodarem sobre AsyncEngine/AsyncSession
+    DATABASE_ASYNC: bool = False
+    # pool de conexões de cada worker (veja /metrics/pool)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_USE_LIFO: bool = False
+    # réplicas de leitura para os GETs, em JSON: '["postgresql+psycopg://…"]'
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 30
+    # por quanto tempo o cliente lê do primário depois de uma escrita
+    CONSISTENCY_TOKEN_MAX_AGE: int = 60
     MIN_PASSWORD_LENGTH: int = 6
+    # custo do Argon2; hashes com outros parâmetros são refeitos no login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    # processos que calculam os hashes de senha (None: CPUs), senhas
+    # aceitas na fila antes de responder 503 e o Retry-After em segundos.
+    # Nas rotas síncronas cada espera ocupa uma thread do threadpool (40
+    # no AnyIO): a fila precisa ficar abaixo disso para sobrar threads
+    HASHING_WORKERS: int | None = None
+    HASHING_MAX_PENDING: int = 24
+    HASHING_RETRY_AFTER: int = 1
+    BULK_USERS_MAX_ITEMS: int = 1000
+    # paginação por cursor das listagens
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 100
+    # segundos que uma contagem de linhas fica em cache (X-Total-Count)
+    COUNT_CACHE_TTL: float = 60
+    # cache do usuário autenticado nas rotas de leitura, por worker
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL: float = 30
+    # tokens JWT já verificados, guardados até o exp, por worker
+    TOKEN_CACHE_SIZE: int = 4096
+    # Bloom filter dos tokens revogados: capacidade, taxa de falsos
+    # positivos e segundos entre as reconstruções a partir da tabela
+    REVOKED_TOKENS_CAPACITY: int = 100_000
+    REVOKED_TOKENS_ERROR_RATE: float = 0.01
+    REVOKED_TOKENS_REFRESH_INTERVAL: float = 10
+    # token buckets do /auth/token: rajada e tentativas por minuto, por
+    # IP e por conta; o backend é 'modulo:fabrica' (None: em memória)
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_ACCOUNT_BURST: int = 5
+    LOGIN_ACCOUNT_PER_MINUTE: float = 1
+    LOGIN_THROTTLE_BACKEND: str | None = None
+    LOGIN_THROTTLE_EVICT_INTERVAL: float = 60
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
@@ -0,0 +1,108 @@
+from importlib import import_module
+from threading import Lock
+from time import monotonic
+from typing import Protocol
+
+from task_flow.settings import Settings
+
+settings = Settings()
+
+
+class BucketBackend(Protocol):
+    """Onde os baldes ficam guardados.
+
+    ``consume`` tira uma ficha do balde ``key`` e devolve 0, ou, com o
+    balde vazio, os segundos até a próxima ficha. Um backend compartilhado
+    (Redis, por exemplo) faz os limites valerem para todos os workers.
+    """
+
+    def consume(self, key: str, capacity: float, rate: float) -> float: ...
+
+    def clear(self): ...
+
+
+class LocalBuckets:
+    """Token buckets em memória, por worker.
+
+    Cada balde é só (fichas, última atualização, instante em que estará
+    cheio). Um balde que já se encheu de novo é igual a um balde novo, e
+    esses são removidos a cada ``evict_interval`` segundos: a memória
+    acompanha apenas as chaves ativas recentemente.
+    """
+
+    def __init__(self, evict_interval: float):
+        self.evict_interval = evict_interval
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = Lock()
+        self._evicted_at = monotonic()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def consume(self, key: str, capacity: float, rate: float) -> float:
+        now = monotonic()
+        with self._lock:
+            if now - self._evicted_at >= self.evict_interval:
+                self._evict(now)
+
+            new_bucket = (capacity, now, now)
+            tokens, updated_at, _ = self._buckets.get(key, new_bucket)
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            full_at = now + (capacity - tokens) / rate
+            self._buckets[key] = (tokens, now, full_at)
+            return wait
+
+    def _evict(self, now: float):
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[2] > now
+        }
+        self._evicted_at = now
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+def load_backend(path: str | None) -> BucketBackend:
+    """Backend configurado como 'modulo:fabrica', ou os baldes locais."""
+    if not path:
+        return LocalBuckets(settings.LOGIN_THROTTLE_EVICT_INTERVAL)
+    module, _, name = path.partition(':')
+    return getattr(import_module(module), name)()
+
+
+class LoginThrottle:
+    """Limite de tentativas de login por IP e por conta.
+
+    Recusa o pedido antes de buscar o usuário e de rodar o Argon2, que é
+    justamente o custo que uma enxurrada de tentativas tenta provocar.
+    """
+
+    def __init__(self, backend: BucketBackend):
+        self.backend = backend
+
+    def retry_after(self, client_ip: str, account: str) -> float:
+        """0 se a tentativa pode seguir, senão os segundos de espera."""
+        wait = self.backend.consume(
+            f'ip:{client_ip}',
+            settings.LOGIN_IP_BURST,
+            settings.LOGIN_IP_PER_MINUTE / 60,
+        )
+        if wait:
+            return wait
+        return self.backend.consume(
+            f'account:{account.lower()}',
+            settings.LOGIN_ACCOUNT_BURST,
+            settings.LOGIN_ACCOUNT_PER_MINUTE / 60,
+        )
+
+    def clear(self):
+        self.backend.clear()
+
+
+login_throttle = LoginThrottle(load_backend(settings.LOGIN_THROTTLE_BACKEND))
@@ -0,0 +1,67 @@
+from hashlib import sha256
+from threading import Lock
+from time import time
+
+from task_flow.cache import TTLCache
+from task_flow.settings import Settings
+
+settings = Settings()
+
+
+def token_key(token: str) -> bytes:
+    # o token inteiro não fica em memória, só o seu hash
+    return sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """Claims de tokens JWT já verificados, guardados até o ``exp``.
+
+    Clientes repetem o mesmo token por vários minutos; com o cache a
+    assinatura HMAC e as claims são verificadas só na primeira requisição.
+    Cada entrada expira junto com o token, então um token vencido nunca é
+    aceito a partir do cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.cache = TTLCache(maxsize=maxsize, ttl=0)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, *, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, token: str) -> dict | None:
+        claims = self.cache.get(token_key(token))
+        # o TTL usa o relógio monotônico; o exp é conferido no relógio real
+        if claims is not None and claims['exp'] <= time():
+            claims = None
+        self._count(hit=claims is not None)
+        return claims
+
+    def set(self, token: str, claims: dict):
+        exp = claims.get('exp')
+        # sem exp o token não expira: não há até quando guardar
+        if isinstance(exp, (int, float)) and exp > time():
+            self.cache.set(token_key(token), claims, ttl=exp - time())
+
+    def status(self) -> dict:
+        return {
+            'size': len(self.cache),
+            'maxsize': self.cache.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
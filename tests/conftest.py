@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from testcontainers.postgres import PostgresContainer
 
 from task_flow.app import app
+from task_flow.counting import row_counter
 from task_flow.database import get_session
 from task_flow.models import (
     Project,
@@ -17,8 +18,11 @@ from task_flow.models import (
     User,
     table_registry,
 )
+from task_flow.revocation import revocation_list
 from task_flow.schemas import TeamSchema
-from task_flow.security import get_password_hash
+from task_flow.security import get_password_hash, principal_cache
+from task_flow.throttling import login_throttle
+from task_flow.tokens import token_cache
 
 
 class UserFactory(factory.Factory):
@@ -49,12 +53,19 @@ def client(session):  # o session é uma fixture que retorna um gerador
     def get_session_override():
         return session
 
+    # revoked_tokens começa vazia em cada teste
+    revocation_list.clear()
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
 
         yield client  # o yield delimita o setup, que roda antes do teste
 
     app.dependency_overrides.clear()  # teardown
+    row_counter.clear()
+    principal_cache.clear()
+    token_cache.clear()
+    login_throttle.clear()
 
 
 # fix que faz a conexão com o bd, executada 1x por sessão de teste
@@ -103,6 +114,25 @@ def mock_db_time():
     return _mock_db_time
 
 
+@pytest.fixture
+def count_queries(engine):
+    # conta os statements enviados ao banco dentro do bloco
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+        yield statements
+
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _count_queries
+
+
 @pytest.fixture
 def user(session):
     pwd = 'testtest'
@@ -130,7 +160,7 @@ def other_user(session):
 
 
 @pytest.fixture
-def token(client, user):
+def login(client, user):
     response = client.post(
         '/auth/token',
         data={
@@ -139,7 +169,17 @@ def token(client, user):
         },
     )
 
-    return response.json()['access_token']
+    return response.json()
+
+
+@pytest.fixture
+def token(login):
+    return login['access_token']
+
+
+@pytest.fixture
+def refresh_token(login):
+    return login['refresh_token']
 
 
 # fixture criada para garantir que o token
@@ -58,7 +58,7 @@ def update_project_name(client, context):
 def verify_project_name_updated(client, context):
     response = client.get('/projects/', headers=context['headers'])
 
-    projects = response.json()
+    projects = response.json()['projects']
     project = next(
         (
             project
@@ -63,7 +63,7 @@ def verify_updated_team_in_project(client, context):
     assert response.status_code == HTTPStatus.OK, (
         f'Error while fetching projects: {response.json()}'
     )
-    projects = response.json()
+    projects = response.json()['projects']
     project_name = context['project_name']
     # Com o next() podemos pegar o primeiro projeto com nome correspondente
     project = next(
@@ -95,7 +95,7 @@ def create_project(client, context):
     response = client.get('/projects/', headers=context['headers'])
     assert response.status_code == HTTPStatus.OK
 
-    projects = response.json()
+    projects = response.json()['projects']
     project = next(
         (p for p in projects if p['project_name'] == context['project_name']),
         None,
@@ -138,7 +138,7 @@ def verify_no_deleted_team_in_project(client, context):
     assert response.status_code == HTTPStatus.OK, (
         f'Error while fetching projects: {response.json()}'
     )
-    projects = response.json()
+    projects = response.json()['projects']
     project_name = context['project_name']
 
     # Com o next() podemos pegar o primeiro projeto com nome correspondente
@@ -104,7 +104,7 @@ def verify_member_of_the_team(client, context):
     response = client.get('/teams/', headers=context['headers'])
     assert response.status_code == HTTPStatus.OK
 
-    teams = response.json()
+    teams = response.json()['teams']
     team_name = context['team_name']
     # Encontra o time pelo nome
     team = next((t for t in teams if t['team_name'] == team_name), None)
@@ -128,7 +128,7 @@ def verify_member_of_the_project(client, context):
     response = client.get('/projects/', headers=context['headers'])
     assert response.status_code == HTTPStatus.OK
 
-    projects = response.json()
+    projects = response.json()['projects']
     project = next(
         (t for t in projects if t['project_name'] == context['project_name']),
         None,
@@ -164,7 +164,7 @@ def update_the_team_list(client, context):
     response = client.get('/teams/', headers=context['headers'])
     assert response.status_code == HTTPStatus.OK
 
-    teams = response.json()
+    teams = response.json()['teams']
     team = next(
         (t for t in teams if t['team_name'] == context['team_name']), None
     )
@@ -211,7 +211,11 @@ def verify_deleted_member_of_the_team(client, context):
     assert response.status_code == HTTPStatus.OK
 
     team = next(
-        (t for t in response.json() if t['team_name'] == context['team_name']),
+        (
+            t
+            for t in response.json()['teams']
+            if t['team_name'] == context['team_name']
+        ),
         None,
     )
     assert team is not None
@@ -241,7 +245,7 @@ def new_update_for_team_list(client, context):
     response = client.get('/teams/', headers=context['headers'])
     assert response.status_code == HTTPStatus.OK
 
-    teams = response.json()
+    teams = response.json()['teams']
     team = next(
         (t for t in teams if t['team_name'] == context['team_name']), None
     )
@@ -297,7 +301,7 @@ def verify_deleted_member_in_the_project(client, context):
     project = next(
         (
             t
-            for t in response.json()
+            for t in response.json()['projects']
             if t['project_name'] == context['project_name']
         ),
         None,
@@ -1,7 +1,17 @@
+from datetime import timedelta
+from hashlib import sha256
 from http import HTTPStatus
 
 import pytest
+from conftest import UserFactory
 from freezegun import freeze_time
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import func, select, update
+
+from task_flow.hashing import settings
+from task_flow.models import RefreshToken
+from task_flow.revocation import BloomFilter, RevocationList, revoke_token
+from task_flow.security import decode_token
 
 pytestmark = pytest.mark.unit
 
@@ -20,6 +30,47 @@ def test_get_token(client, user):
     assert response.status_code == HTTPStatus.OK
     assert token['token_type'] == 'Bearer'
     assert 'access_token' in token
+    assert 'refresh_token' in token
+
+
+def test_login_rehashes_password_with_outdated_parameters(client, session):
+    password = 'senha_antiga'
+    weak_hash = Argon2Hasher(time_cost=1, memory_cost=1024, parallelism=1)
+    user = UserFactory(password=weak_hash.hash(password))
+    session.add(user)
+    session.commit()
+    old_hash = user.password
+
+    response = client.post(
+        'auth/token', data={'username': user.email, 'password': password}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    session.refresh(user)
+    assert user.password != old_hash
+    assert (
+        f'm={settings.ARGON2_MEMORY_COST},t={settings.ARGON2_TIME_COST},'
+        f'p={settings.ARGON2_PARALLELISM}'
+    ) in user.password
+
+    # a senha continua a mesma
+    response = client.post(
+        'auth/token', data={'username': user.email, 'password': password}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_login_keeps_current_hash(client, session, user):
+    current_hash = user.password
+
+    response = client.post(
+        'auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    session.refresh(user)
+    assert user.password == current_hash
 
 
 def test_token_expired_after_time(client, user):
@@ -74,10 +125,9 @@ def test_token_wrong_email(client, user):
     assert response.json() == {'detail': 'Invalid username or password'}
 
 
-def test_refresh_wrong_email(client, token):
+def test_refresh_token(client, refresh_token):
     response = client.post(
-        '/auth/refresh_token',
-        headers={'Authorization': f'Bearer {token}'},
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
     )
 
     data = response.json()
@@ -86,11 +136,13 @@ def test_refresh_wrong_email(client, token):
     assert 'access_token' in data
     assert 'token_type' in data
     assert data['token_type'] == 'bearer'
+    # rotação: cada troca devolve um refresh token novo
+    assert data['refresh_token'] != refresh_token
 
 
-def test_token_expired_dont_refresh(client, user):
+def test_refresh_after_access_token_expired(client, user):
     with freeze_time('2025-01-01 12:00:00'):
-        # gerar o token (12:00)
+        # gerar os tokens (12:00)
         response = client.post(
             'auth/token',
             data={
@@ -99,15 +151,140 @@ def test_token_expired_dont_refresh(client, user):
             },
         )
         assert response.status_code == HTTPStatus.OK
-        token = response.json()['access_token']
-        # a gente pega o token que foi gerado para o meio dia
+        tokens = response.json()
 
     with freeze_time('2025-01-01 12:31:00'):
-        # Usa o token (12:31)
+        # o access token venceu (12:31), mas o refresh token ainda vale
         response = client.post(
             '/auth/refresh_token',
-            headers={'Authorization': f'Bearer {token}'},
+            json={'refresh_token': tokens['refresh_token']},
         )
+        assert response.status_code == HTTPStatus.OK
 
+        response = client.get(
+            '/search/?q=time',
+            headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+        )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Credenciais inválidas'}
+
+
+def test_login_stores_only_refresh_token_hash(session, refresh_token):
+    stored = session.scalar(select(RefreshToken.token_hash))
+
+    assert stored == sha256(refresh_token.encode()).hexdigest()
+
+
+def test_refresh_token_reuse_revokes_family(client, refresh_token):
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
+    )
+    rotated = response.json()['refresh_token']
+
+    # o token antigo de novo: reuso, a família toda é revogada
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': rotated}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_refresh_token_revoked_by_email_change(
+    client, user, token, refresh_token
+):
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': user.username,
+            'email': 'novo_email@teste.com',
+            'password': user.clean_password,
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    # o refresh token emitido antes da troca não gera novos tokens
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_expired_refresh_token_dont_refresh(client, session, refresh_token):
+    session.execute(
+        update(RefreshToken).values(expires_at=func.now() - timedelta(days=1))
+    )
+    session.commit()
+
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Credenciais inválidas'}
+
+
+def test_logout_revokes_refresh_token(client, token, refresh_token):
+    response = client.post(
+        '/auth/logout',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'refresh_token': refresh_token},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        '/auth/refresh_token', json={'refresh_token': refresh_token}
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_logout_revokes_token(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.post('/auth/logout', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'message': 'Logged out'}
+    response = client.delete(f'/users/{user.id}', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_valid_token_does_not_query_revoked_tokens(
+    client, token, count_queries
+):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with count_queries() as statements:
+        client.get('/search/?q=time', headers=headers)
+
+    # o jti não está no Bloom filter: a tabela não é consultada
+    assert not any('revoked_tokens' in statement for statement in statements)
+
+
+def test_revocation_list_loads_revocations_from_table(session, token):
+    claims = decode_token(token)
+    revoke_token(session, claims)
+    session.commit()
+    # outro worker: filtro vazio, carregado da tabela na primeira consulta
+    worker = RevocationList(capacity=10, error_rate=0.01, refresh_interval=60)
+
+    assert worker.is_revoked(session, claims['jti'])
+    assert not worker.is_revoked(session, 'outro-jti')
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f'jti-{index}' for index in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f'outro-{index}' in bloom for index in range(1000))
+    # 1% esperado; folga para a variação da amostra
+    max_false_positives = 50
+    assert false_positives < max_false_positives
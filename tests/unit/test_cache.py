@@ -0,0 +1,30 @@
+import pytest
+from freezegun import freeze_time
+
+from task_flow.cache import TTLCache
+
+pytestmark = pytest.mark.unit
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    with freeze_time('2025-01-01 12:00:00') as frozen:
+        cache.set('chave', 'valor')
+        assert cache.get('chave') == 'valor'
+
+        frozen.tick(61)
+        assert cache.get('chave') is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 'primeiro')
+    cache.set('b', 'segundo')
+    cache.get('a')
+
+    cache.set('c', 'terceiro')
+
+    assert cache.get('a') == 'primeiro'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'terceiro'
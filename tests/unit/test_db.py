@@ -25,6 +25,9 @@ def test_create_user(session, mock_db_time):
         'username': 'mari',
         'password': 'minhasenha',
         'email': 'mari2@email.com',
+        'token_version': 0,
+        # gerado pelo Postgres a partir do username
+        'search_vector': "'mari':1",
         'created_at': time,
         'updated_at': time,
         'teams': [],
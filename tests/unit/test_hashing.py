@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy.util.concurrency import greenlet_spawn
+
+from task_flow.hashing import (
+    HashingExecutor,
+    HashingSaturated,
+    hash_password,
+    hash_passwords,
+    hashing_executor,
+    verify_password_hash,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def test_hash_passwords_keeps_order():
+    passwords = [f'senha{i}' for i in range(5)]
+
+    hashes = hash_passwords(passwords)
+
+    assert len(hashes) == len(passwords)
+    for password, hashed in zip(passwords, hashes):
+        assert verify_password_hash(password, hashed)
+
+
+def test_hash_passwords_reserves_one_slot_per_password(monkeypatch):
+    reservations = []
+    reserve = hashing_executor._reserve
+
+    def spy(tasks):
+        reservations.append(tasks)
+        reserve(tasks)
+
+    monkeypatch.setattr(hashing_executor, '_reserve', spy)
+    monkeypatch.setattr(hashing_executor, 'max_pending', 2)
+    passwords = [f'senha{i}' for i in range(5)]
+
+    hash_passwords(passwords)
+
+    # levas que cabem na fila, somando uma posição por senha
+    assert sum(reservations) == len(passwords)
+    assert max(reservations) <= hashing_executor.max_pending
+
+
+def test_executor_wait_does_not_block_event_loop():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        # como no run_sync da AsyncSession: o endpoint roda em um greenlet
+        await greenlet_spawn(executor.run, time.sleep, 0.5)
+        task.cancel()
+
+    try:
+        asyncio.run(main())
+    finally:
+        executor.pool.shutdown()
+
+    # bloqueando o loop, o ticker não andaria durante o sleep
+    min_ticks = 10
+    assert ticks >= min_ticks
+
+
+def test_executor_rejects_when_queue_is_full():
+    executor = HashingExecutor(max_workers=1, max_pending=0)
+
+    with pytest.raises(HashingSaturated):
+        executor.run(verify_password_hash, 'senha', 'hash')
+
+    status = executor.status()
+    assert status['rejected'] == 1
+    assert status['pending'] == 0
+    # recusado antes de subir o pool de processos
+    assert executor._pool is None
+
+
+def test_executor_recovers_from_dead_worker():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+    broken_pool = executor.pool
+
+    # o processo do pool morre no meio do trabalho, como num OOM kill
+    with pytest.raises(HashingSaturated):
+        executor.run(os._exit, 1)
+
+    try:
+        assert executor._pool is None
+        assert executor.status()['pending'] == 0
+        hashed = executor.run(hash_password, 'senha')
+        assert verify_password_hash('senha', hashed)
+        assert executor.pool is not broken_pool
+    finally:
+        executor.pool.shutdown()
+
+
+def test_create_user_when_hashing_is_saturated(client, monkeypatch):
+    monkeypatch.setattr(hashing_executor, 'max_pending', 0)
+
+    response = client.post(
+        '/users',
+        json={
+            'username': 'bolinha',
+            'email': 'bolinha@teste.com',
+            'password': 'password',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_login_when_hashing_is_saturated(client, user, monkeypatch):
+    monkeypatch.setattr(hashing_executor, 'max_pending', 0)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert 'Retry-After' in response.headers
+
+
+def test_read_hashing_metrics(client, token):
+    response = client.get(
+        '/metrics/hashing', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data['workers'] == hashing_executor.max_workers
+    assert data['pending'] == 0
+    # pelo menos o hash do usuário e a verificação no login
+    operations = 2
+    assert data['completed'] >= operations
+    assert data['latency_max_ms'] > 0
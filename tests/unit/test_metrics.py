@@ -0,0 +1,106 @@
+import os
+import time
+from http import HTTPStatus
+
+import pytest
+from conftest import UserFactory
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from task_flow.counting import row_counter
+from task_flow.models import User
+from task_flow.pool import InstrumentedQueuePool, pool_status
+
+pytestmark = pytest.mark.unit
+
+
+def test_read_pool_metrics(client, token):
+    response = client.get(
+        '/metrics/pool', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data['pid'] == os.getpid()
+    assert [pool['name'] for pool in data['pools']] == ['primary']
+
+
+@pytest.mark.parametrize(
+    'path', ['/metrics/pool', '/metrics/hashing', '/metrics/tokens']
+)
+def test_metrics_require_authentication(client, path):
+    response = client.get(path)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_pool_status_counts_checkouts_and_timeouts(engine):
+    instrumented = create_engine(
+        engine.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+
+    with instrumented.connect():
+        status = pool_status('test', instrumented.pool)
+        assert status['checked_out'] == 1
+        assert status['idle'] == 0
+
+        with pytest.raises(PoolTimeoutError):
+            instrumented.connect()
+
+    status = pool_status('test', instrumented.pool)
+    assert status['checked_out'] == 0
+    assert status['idle'] == 1
+    assert status['waits'] == 1
+    assert status['timeouts'] == 1
+    instrumented.dispose()
+
+
+def test_pool_wait_excludes_opening_connections(engine):
+    instrumented = create_engine(
+        engine.url, poolclass=InstrumentedQueuePool, pool_size=1
+    )
+    connect_seconds = 0.2
+
+    @event.listens_for(instrumented, 'do_connect')
+    def slow_connect(*args):
+        time.sleep(connect_seconds)
+
+    # o pool está vazio: a conexão é aberta na hora, sem fila
+    with instrumented.connect():
+        pass
+
+    status = pool_status('test', instrumented.pool)
+    assert status['waits'] == 1
+    assert status['wait_time_max_ms'] < connect_seconds * 1000
+    instrumented.dispose()
+
+
+def test_read_row_counts(client, token, team_list):
+    response = client.get(
+        '/metrics/counts',
+        params={'exact': True},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        # os usuários dos times mais o dono do token
+        'users': len(team_list) + 1,
+        'teams': len(team_list),
+        'projects': 0,
+    }
+
+
+def test_row_counter_caches_counts(session, client, users):
+    assert row_counter.exact(session, User) == len(users)
+
+    session.add(UserFactory())
+    session.commit()
+
+    assert row_counter.exact(session, User) == len(users)
+    row_counter.clear()
+    assert row_counter.exact(session, User) == len(users) + 1
@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 import pytest
+from conftest import ProjectFactory
 
 from task_flow.utils.utils import assert_project_has_teams, get_project_by_id
 
@@ -61,7 +62,7 @@ def test_read_projects(client, token, projects_with_teams, team_list):
     )
 
     assert response.status_code == HTTPStatus.OK
-    data = response.json()
+    data = response.json()['projects']
     project = get_project_by_id(data, projects_with_teams.id)
     assert project is not None
     assert project['project_name'] == projects_with_teams.project_name
@@ -78,7 +79,7 @@ def test_read_project_with_name(client, token, projects_with_teams, team_list):
     )
 
     assert response.status_code == HTTPStatus.OK
-    data = response.json()
+    data = response.json()['projects']
 
     # dicionario
     assert data[0]['id'] == projects_with_teams.id
@@ -135,6 +136,110 @@ def test_not_read_project_with_id_less_than_1(
     assert response.json() == {'detail': 'Project not found'}
 
 
+def test_read_projects_runs_constant_queries(
+    client,
+    token,
+    projects_with_teams,
+    another_project_with_same_name,
+    count_queries,
+):
+    with count_queries() as statements:
+        response = client.get(
+            '/projects',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    project_count = 2
+    assert len(response.json()['projects']) == project_count
+    # usuário logado, projetos, times e usuários dos times
+    query_count = 4
+    assert len(statements) == query_count
+
+
+def test_read_projects_with_sql_aggregation(
+    client, token, projects_with_teams, another_project_with_same_name
+):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    orm_response = client.get('/projects', headers=headers)
+    response = client.get(
+        '/projects', headers=headers, params={'sql_aggregation': True}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json() == orm_response.json()
+
+
+def test_read_projects_with_sql_aggregation_paginated(
+    client, token, projects_with_teams, another_project_with_same_name
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'limit': 1}
+    returned_ids = []
+
+    for _ in range(2):
+        orm_response = client.get('/projects', headers=headers, params=params)
+        response = client.get(
+            '/projects',
+            headers=headers,
+            params={**params, 'sql_aggregation': True},
+        )
+        assert response.json() == orm_response.json()
+        returned_ids += [p['id'] for p in response.json()['projects']]
+        params['cursor'] = response.json()['next_cursor']
+
+    assert params['cursor'] is None
+    assert returned_ids == [
+        projects_with_teams.id,
+        another_project_with_same_name.id,
+    ]
+
+
+def test_read_projects_ranked_by_similarity_with_sql_aggregation(
+    client, session, token, team_list, users
+):
+    for name in ('roadmap', 'roadmap 2026', 'mapa de riscos', 'road'):
+        project = ProjectFactory(
+            project_name=name, current_user_id=users[0].id
+        )
+        project.teams = team_list
+        session.add(project)
+    session.commit()
+
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'project_name': 'roadmap', 'match': 'similar', 'limit': 1}
+    names = []
+
+    for _ in range(3):
+        orm_response = client.get('/projects', headers=headers, params=params)
+        response = client.get(
+            '/projects',
+            headers=headers,
+            params={**params, 'sql_aggregation': True},
+        )
+        assert response.json() == orm_response.json()
+        names += [p['project_name'] for p in response.json()['projects']]
+        params['cursor'] = response.json()['next_cursor']
+
+    assert params['cursor'] is None
+    assert names == ['roadmap', 'roadmap 2026', 'road']
+
+
+def test_not_read_projects_with_sql_aggregation_that_does_not_exist(
+    client, token
+):
+    response = client.get(
+        '/projects',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'sql_aggregation': True},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Project not found'}
+
+
 # >>>>>> TESTES DE ATUALIZAR PROJETOS
 
 
@@ -297,6 +402,105 @@ def test_not_update_another_user_project(
     )
 
 
+# >>>>>> TESTES DE TIMES DO PROJETO
+
+
+def test_add_project_team(
+    client, owner_token, projects_with_teams, other_team_list
+):
+    new_team = other_team_list[0]
+    response = client.post(
+        f'/projects/{projects_with_teams.id}/teams/{new_team.team_name}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'changed': [new_team.team_name]}
+
+    response = client.get(
+        f'/projects/{projects_with_teams.id}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+    assert new_team.id in {team['id'] for team in response.json()['teams']}
+
+
+def test_add_project_teams_skips_existing(
+    client, owner_token, projects_with_teams, team_list, other_team_list
+):
+    response = client.post(
+        f'/projects/{projects_with_teams.id}/teams',
+        headers={'Authorization': f'Bearer {owner_token}'},
+        json={
+            'team_names': [
+                team_list[0].team_name,
+                other_team_list[0].team_name,
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'changed': [other_team_list[0].team_name]}
+
+
+def test_not_add_project_team_that_does_not_exist(
+    client, owner_token, projects_with_teams
+):
+    response = client.post(
+        f'/projects/{projects_with_teams.id}/teams/newTeam',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Teams not found'}
+
+
+def test_remove_project_team(
+    client, owner_token, projects_with_teams, team_list
+):
+    removed = team_list[0]
+    response = client.delete(
+        f'/projects/{projects_with_teams.id}/teams/{removed.team_name}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'changed': [removed.team_name]}
+
+    response = client.get(
+        f'/projects/{projects_with_teams.id}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+    assert_project_has_teams(response.json(), team_list[1:])
+
+
+def test_not_remove_last_project_team(
+    client, owner_token, projects_with_teams, team_list
+):
+    response = client.request(
+        'DELETE',
+        f'/projects/{projects_with_teams.id}/teams',
+        headers={'Authorization': f'Bearer {owner_token}'},
+        json={'team_names': [team.team_name for team in team_list]},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Project must have at least one team'}
+
+
+def test_not_remove_team_from_another_user_project(
+    client, another_owner_token, projects_with_teams, team_list
+):
+    response = client.delete(
+        f'/projects/{projects_with_teams.id}/teams/{team_list[0].team_name}',
+        headers={'Authorization': f'Bearer {another_owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json()['detail'].endswith(
+        'Only the project owner can perform this action.'
+    )
+
+
 # >>>>>> TESTES DE DELETAR PROJETOS
 
 
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import insert, select
+from starlette.requests import Request
+
+from task_flow import database
+from task_flow.models import User
+from task_flow.replicas import (
+    CONSISTENCY_HEADER,
+    Replica,
+    ReplicaSet,
+    RoutingSession,
+    parse_lsn,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def make_request(method='GET', headers=None):
+    return Request({
+        'type': 'http',
+        'method': method,
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+    })
+
+
+@pytest.fixture
+def replica_set(engine, monkeypatch):
+    # o próprio banco de teste faz o papel de réplica
+    replicas = ReplicaSet([Replica(engine, None)], check_interval=30)
+    monkeypatch.setattr(database, 'replicas', replicas)
+    monkeypatch.setattr(database, 'engine', engine)
+    return replicas
+
+
+def test_parse_lsn():
+    assert parse_lsn('0/1') == 1
+    assert parse_lsn('16/B374D848') == (0x16 << 32) + 0xB374D848
+    assert parse_lsn('invalido') is None
+    assert parse_lsn(None) is None
+
+
+def test_replica_set_round_robin_skips_unhealthy():
+    first, second, third = (Replica(None, None) for _ in range(3))
+    replicas = ReplicaSet([first, second, third], check_interval=30)
+
+    assert replicas.candidates() == [first, second, third]
+    assert replicas.candidates() == [second, third, first]
+
+    replicas.mark_unhealthy(third)
+
+    assert replicas.candidates() == [first, second]
+
+
+def test_routing_session_sends_writes_to_primary(engine):
+    replica = object()
+    session = RoutingSession(engine, replica=replica)
+
+    assert session.get_bind(clause=select(User)) is replica
+    assert session.get_bind(clause=insert(User)) is engine
+
+
+def test_read_replica_only_for_reads(replica_set):
+    [replica] = replica_set.replicas
+
+    assert database.read_replica(make_request('GET')) is replica
+    assert database.read_replica(make_request('POST')) is None
+
+
+def test_read_replica_uses_primary_when_replica_is_behind(replica_set):
+    # um primário não tem LSN de replay, então nunca alcança o token
+    request = make_request('GET', {CONSISTENCY_HEADER: '0/1'})
+
+    assert database.read_replica(request) is None
+
+
+def test_commit_sets_consistency_token(session, replica_set):
+    request = make_request('POST')
+    sessions = database.get_session(request)
+    db_session = next(sessions)
+    db_session.add(User(username='lsn', email='lsn@test.com', password='x'))
+    db_session.commit()
+
+    with pytest.raises(StopIteration):
+        next(sessions)
+
+    assert parse_lsn(request.state.commit_lsn)
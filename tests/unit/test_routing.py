@@ -0,0 +1,147 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Event
+from typing import List
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from task_flow import security
+from task_flow.database import get_async_session
+from task_flow.hashing import hashing_executor, verify_and_update_hash
+from task_flow.routers import auth, teams, users
+from task_flow.routing import AsyncSessionRoute
+from task_flow.schemas import TeamPublic
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def async_app(session, engine):
+    # cada TestClient roda em um event loop próprio, então sem pool
+    async_engine = create_async_engine(engine.url, poolclass=NullPool)
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine) as async_session:
+            yield async_session
+
+    app = FastAPI()
+    for source in (users.router, auth.router, teams.router):
+        router = APIRouter(route_class=AsyncSessionRoute)
+        for route in source.routes:
+            router.add_api_route(
+                route.path,
+                route.endpoint,
+                methods=route.methods,
+                response_model=route.response_model,
+                status_code=route.status_code,
+            )
+        app.include_router(router)
+    app.dependency_overrides[get_async_session] = get_async_session_override
+
+    return app
+
+
+@pytest.fixture
+def async_client(async_app):
+    with TestClient(async_app) as client:
+        yield client
+
+
+def test_async_route_is_coroutine():
+    route = AsyncSessionRoute(
+        '/teams', teams.read_teams, response_model=List[TeamPublic]
+    )
+
+    assert route.dependant.call is not teams.read_teams
+    assert route.dependant.call.__wrapped__ is teams.read_teams
+
+
+def test_async_create_user_and_login(async_client):
+    response = async_client.post(
+        '/users/',
+        json={
+            'username': 'async',
+            'email': 'async@test.com',
+            'password': 'secret',
+        },
+    )
+    assert response.status_code == HTTPStatus.CREATED
+
+    response = async_client.post(
+        '/auth/token',
+        data={'username': 'async@test.com', 'password': 'secret'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'access_token' in response.json()
+
+
+def test_async_read_teams_loads_nested_users(
+    async_client, team_with_users, owner_token
+):
+    response = async_client.get(
+        '/teams/', headers={'Authorization': f'Bearer {owner_token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    [team] = response.json()['teams']
+    assert team['team_name'] == team_with_users.team_name
+    assert {u['username'] for u in team['users']} == {
+        u.username for u in team_with_users.users
+    }
+
+
+def test_async_login_does_not_block_other_requests(
+    async_app, user, monkeypatch
+):
+    # o login só termina depois que um /ping é atendido durante a
+    # verificação da senha; com o event loop bloqueado esperando o
+    # hashing, o /ping não roda e a verificação desiste
+    hashing, released = Event(), Event()
+    wait_seconds = 10
+
+    def verify_after_ping(password, hashed):
+        hashing.set()
+        if not released.wait(wait_seconds):
+            return False, None
+        return verify_and_update_hash(password, hashed)
+
+    monkeypatch.setattr(security, 'verify_and_update_hash', verify_after_ping)
+    # threads em vez de processos, para compartilhar os Events
+    monkeypatch.setattr(hashing_executor, '_pool', ThreadPoolExecutor(1))
+
+    @async_app.get('/release')
+    async def release():
+        await asyncio.to_thread(hashing.wait, wait_seconds)
+        released.set()
+        return {}
+
+    async def main():
+        transport = ASGITransport(app=async_app)
+        async with AsyncClient(
+            transport=transport, base_url='http://test'
+        ) as client:
+            login = asyncio.create_task(
+                client.post(
+                    '/auth/token',
+                    data={
+                        'username': user.email,
+                        'password': user.clean_password,
+                    },
+                )
+            )
+            await client.get('/release')
+            return await login
+
+    try:
+        response = asyncio.run(main())
+    finally:
+        hashing_executor._pool.shutdown()
+
+    assert released.is_set()
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from conftest import ProjectFactory, TeamFactory, UserFactory
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def searchable(session, user):
+    runner = UserFactory(username='roadrunner')
+    session.add(runner)
+    session.flush()
+    team = TeamFactory(team_name='road_crew', current_user_id=user.id)
+    team.users = [runner]
+    project = ProjectFactory(project_name='roadmap', current_user_id=user.id)
+    project.teams = [team]
+    other = ProjectFactory(project_name='mapa', current_user_id=user.id)
+    other.teams = [team]
+    session.add_all([team, project, other])
+    session.commit()
+    return {'user': runner, 'team': team, 'project': project}
+
+
+def test_search_by_prefix_across_types(client, token, searchable):
+    response = client.get(
+        '/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': 'ROAD'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert {(hit['type'], hit['name']) for hit in data['results']} == {
+        ('users', 'roadrunner'),
+        ('teams', 'road_crew'),
+        ('projects', 'roadmap'),
+    }
+    assert data['facets'] == {'users': 1, 'teams': 1, 'projects': 1}
+    assert data['next_cursor'] is None
+
+
+def test_search_requires_every_word(client, token, searchable):
+    response = client.get(
+        '/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': 'road cr'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [hit['name'] for hit in response.json()['results']] == ['road_crew']
+
+
+def test_search_filtered_by_type_keeps_facets(client, token, searchable):
+    response = client.get(
+        '/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': 'road', 'types': ['projects', 'teams']},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert {hit['type'] for hit in data['results']} == {'projects', 'teams'}
+    assert data['facets'] == {'users': 1, 'teams': 1, 'projects': 1}
+
+
+def test_search_paginated_with_cursor(client, token, searchable):
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'q': 'road'}
+
+    response = client.get('/search', headers=headers, params=params)
+    expected = [(hit['type'], hit['id']) for hit in response.json()['results']]
+
+    returned = []
+    params['limit'] = 1
+    for _ in expected:
+        response = client.get('/search', headers=headers, params=params)
+        returned += [
+            (hit['type'], hit['id']) for hit in response.json()['results']
+        ]
+        params['cursor'] = response.json()['next_cursor']
+
+    assert params['cursor'] is None
+    assert returned == expected
+
+
+def test_search_without_words_returns_nothing(client, token, searchable):
+    response = client.get(
+        '/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': ':* & !'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'results': [],
+        'facets': {'users': 0, 'teams': 0, 'projects': 0},
+        'next_cursor': None,
+    }
+
+
+def test_not_search_with_invalid_cursor(client, token):
+    response = client.get(
+        '/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': 'road', 'cursor': 'invalido'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_not_search_without_token(client):
+    response = client.get('/search', params={'q': 'road'})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -1,9 +1,15 @@
 from http import HTTPStatus
 
 import pytest
+from freezegun import freeze_time
 from jwt import decode
 
-from task_flow.security import create_access_token, settings
+from task_flow.security import (
+    create_access_token,
+    principal_cache,
+    settings,
+    token_claims,
+)
 
 pytestmark = pytest.mark.unit
 
@@ -52,3 +58,72 @@ def test_get_current_user_user_not_autorized(client):
 
     assert respose.status_code == HTTPStatus.UNAUTHORIZED
     assert respose.json() == {'detail': 'Credenciais inválidas'}
+
+
+def test_token_cache_skips_repeated_verification(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/search/?q=time', headers=headers)
+    client.get('/search/?q=time', headers=headers)
+
+    response = client.get('/metrics/tokens', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    # a primeira requisição verifica o token; a segunda e a própria
+    # leitura das métricas usam o cache
+    hits = 2
+    assert data['misses'] == 1
+    assert data['hits'] == hits
+    assert data['size'] == 1
+
+
+def test_token_cache_does_not_outlive_exp(client, user):
+    with freeze_time('2025-01-01 12:00:00'):
+        token = create_access_token(token_claims(user))
+        headers = {'Authorization': f'Bearer {token}'}
+        response = client.get('/search/?q=time', headers=headers)
+        assert response.status_code == HTTPStatus.OK
+
+    with freeze_time('2025-01-01 12:31:00'):
+        response = client.get('/search/?q=time', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_identifies_user_by_id_and_version(user, token):
+    claims = decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+
+    assert claims['sub'] == str(user.id)
+    assert claims['token_version'] == user.token_version
+
+
+def test_bumping_token_version_revokes_tokens(client, session, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    user.token_version += 1
+    session.commit()
+    # alteração feita fora da API: o cache de principals só sairia pelo TTL
+    principal_cache.clear()
+
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = client.delete(f'/users/{user.id}', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_update_user_keeps_token_when_email_is_unchanged(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    user_data = {
+        'username': 'outro_nome',
+        'email': user.email,
+        'password': user.clean_password,
+    }
+
+    client.put(f'/users/{user.id}', headers=headers, json=user_data)
+
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.OK
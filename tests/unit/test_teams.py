@@ -1,7 +1,10 @@
 from http import HTTPStatus
 
 import pytest
+from sqlalchemy import exists, select
 
+from task_flow.models import projects_teams, teams_users
+from task_flow.schemas import settings
 from task_flow.utils.utils import (
     assert_team_has_users,
     get_team_by_id,
@@ -50,6 +53,43 @@ def test_create_teams(client, token):
     assert emails == {'mari@email.com', 'bia@email.com'}
 
 
+def test_read_teams_caches_current_user(client, token, count_queries):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with count_queries() as first:
+        client.get('/teams', headers=headers)
+    with count_queries() as second:
+        client.get('/teams', headers=headers)
+
+    # a segunda leitura reaproveita o usuário autenticado do cache
+    assert len(second) == len(first) - 1
+
+
+def test_create_team_runs_no_extra_reads(client, token, users, count_queries):
+    team_data = {
+        'team_name': 'bolinha',
+        'user_list': [user.username for user in users],
+    }
+
+    with count_queries() as statements:
+        response = client.post(
+            '/teams',
+            headers={'Authorization': f'Bearer {token}'},
+            json=team_data,
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert_team_has_users(response.json(), users)
+    # usuário logado, usuários do time, INSERT do time e de teams_users;
+    # a resposta é montada com o que já foi lido
+    assert [statement.split()[0] for statement in statements] == [
+        'SELECT',
+        'SELECT',
+        'INSERT',
+        'INSERT',
+    ]
+
+
 def test_not_create_team_with_users_does_not_exist(client, token):
     response = client.post(
         '/teams',
@@ -87,7 +127,7 @@ def test_read_teams(client, token, team_with_users, users):
     )
 
     assert response.status_code == HTTPStatus.OK
-    data = response.json()
+    data = response.json()['teams']
     team = get_team_by_id(data, team_with_users.id)
     assert team is not None
     assert team['team_name'] == team_with_users.team_name
@@ -102,13 +142,69 @@ def test_read_team_with_name(client, token, team_with_users, users):
     )
 
     assert response.status_code == HTTPStatus.OK
-    data = response.json()
+    data = response.json()['teams']
 
     # dicionario
     assert data[0]['id'] == team_with_users.id
     assert data[0]['team_name'] == team_with_users.team_name
 
 
+def test_read_teams_with_case_insensitive_name(
+    client, token, team_list, other_team_list
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'team_name': 'TEAM1'}
+
+    response = client.get('/teams', headers=headers, params=params)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+    response = client.get(
+        '/teams', headers=headers, params={**params, 'case_insensitive': True}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [team['team_name'] for team in response.json()['teams']] == [
+        'team1',
+        'other_team1',
+    ]
+
+
+def test_read_teams_ranked_by_similarity(
+    client, token, team_list, other_team_list
+):
+    response = client.get(
+        '/teams',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'team_name': 'other_team1', 'match': 'similar'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    names = [team['team_name'] for team in response.json()['teams']]
+    # o nome exato primeiro, depois os mais parecidos
+    assert names[0] == 'other_team1'
+    assert set(names[1:3]) == {'other_team0', 'other_team2'}
+
+
+def test_read_teams_ranked_by_similarity_paginated(
+    client, token, team_list, other_team_list
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {'team_name': 'other_team1', 'match': 'similar'}
+
+    response = client.get('/teams', headers=headers, params=params)
+    expected = [team['id'] for team in response.json()['teams']]
+
+    returned_ids = []
+    params['limit'] = 1
+    for _ in expected:
+        response = client.get('/teams', headers=headers, params=params)
+        returned_ids += [team['id'] for team in response.json()['teams']]
+        params['cursor'] = response.json()['next_cursor']
+
+    assert params['cursor'] is None
+    assert returned_ids == expected
+
+
 # Ler time pelo nome errado
 def test_not_read_teams_that_does_not_exist(client, token):
     response = client.get(
@@ -158,6 +254,77 @@ def test_not_read_teams_with_id_less_than_1(client, token):
     assert response.json() == {'detail': 'Team not found'}
 
 
+def test_read_teams_runs_constant_queries(
+    client, token, team_list, other_team_list, count_queries
+):
+    with count_queries() as statements:
+        response = client.get(
+            '/teams',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['teams']) == len(team_list) + len(
+        other_team_list
+    )
+    # usuário logado, times e usuários dos times
+    query_count = 3
+    assert len(statements) == query_count
+
+
+def test_read_teams_paginated_with_cursor(
+    client, token, team_list, other_team_list
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    page_size = 4
+
+    response = client.get(
+        '/teams', headers=headers, params={'limit': page_size}
+    )
+    first_page = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(first_page['teams']) == page_size
+    assert first_page['next_cursor'] is not None
+
+    response = client.get(
+        '/teams',
+        headers=headers,
+        params={'limit': page_size, 'cursor': first_page['next_cursor']},
+    )
+    second_page = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert second_page['next_cursor'] is None
+    returned_ids = [
+        team['id'] for team in first_page['teams'] + second_page['teams']
+    ]
+    assert returned_ids == sorted(
+        team.id for team in team_list + other_team_list
+    )
+
+
+def test_not_read_teams_with_invalid_cursor(client, token, team_list):
+    response = client.get(
+        '/teams',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'cursor': 'invalido'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_not_read_teams_with_limit_above_maximum(client, token, team_list):
+    response = client.get(
+        '/teams',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'limit': settings.MAX_PAGE_SIZE + 1},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 # >>>>>> TESTES DE ATUALIZAR TIMES
 
 
@@ -275,6 +442,29 @@ def test_update_team_list_removing_a_user(
     assert removed_user.username not in returned_usernames
 
 
+def test_update_team_list_writes_only_the_difference(
+    client, owner_token, team_with_users, other_user, count_queries
+):
+    url = f'/teams/{team_with_users.id}'
+
+    with count_queries() as statements:
+        response = client.patch(
+            url,
+            headers={'Authorization': f'Bearer {owner_token}'},
+            json={'user_list': [other_user.username]},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert_team_has_users(response.json(), [other_user])
+    writes = [
+        statement.split()[0]
+        for statement in statements
+        if 'teams_users' in statement and not statement.startswith('SELECT')
+    ]
+    # um DELETE de quem saiu e um INSERT de quem entrou, sem ler a coleção
+    assert writes == ['DELETE', 'INSERT']
+
+
 # atualizar os usuarios:
 # adicionar um usuario que nao existe detail='Users not found',
 def test_not_update_team_with_non_existent_user(
@@ -323,6 +513,122 @@ def test_not_update_another_user_team(
     )
 
 
+# >>>>>> TESTES DE MEMBROS DO TIME
+
+
+def test_add_team_member(
+    client, owner_token, team_with_users, other_user, count_queries
+):
+    url = f'/teams/{team_with_users.id}/members/{other_user.username}'
+
+    with count_queries() as statements:
+        response = client.post(
+            url, headers={'Authorization': f'Bearer {owner_token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'changed': [other_user.username]}
+    # usuário logado, dono do time, ids dos usuários e o INSERT
+    query_count = 4
+    assert len(statements) == query_count
+
+    response = client.get(
+        f'/teams/{team_with_users.id}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+    usernames = {user['username'] for user in response.json()['users']}
+    assert other_user.username in usernames
+
+
+def test_add_team_members_skips_existing(
+    client, owner_token, team_with_users, users, other_user
+):
+    response = client.post(
+        f'/teams/{team_with_users.id}/members',
+        headers={'Authorization': f'Bearer {owner_token}'},
+        json={'usernames': [users[0].username, other_user.username]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'changed': [other_user.username]}
+
+
+def test_not_add_team_member_that_does_not_exist(
+    client, owner_token, team_with_users
+):
+    response = client.post(
+        f'/teams/{team_with_users.id}/members/newUser',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Users not found'}
+
+
+def test_not_add_member_to_another_user_team(
+    client, token, team_with_users, other_user
+):
+    response = client.post(
+        f'/teams/{team_with_users.id}/members/{other_user.username}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_remove_team_members(client, owner_token, team_with_users, users):
+    response = client.request(
+        'DELETE',
+        f'/teams/{team_with_users.id}/members',
+        headers={'Authorization': f'Bearer {owner_token}'},
+        json={'usernames': [user.username for user in users[1:]]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert set(response.json()['changed']) == {
+        user.username for user in users[1:]
+    }
+
+    response = client.get(
+        f'/teams/{team_with_users.id}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+    assert_team_has_users(response.json(), users[:1])
+
+
+def test_not_remove_last_team_member(
+    client, owner_token, team_with_users, users
+):
+    response = client.request(
+        'DELETE',
+        f'/teams/{team_with_users.id}/members',
+        headers={'Authorization': f'Bearer {owner_token}'},
+        json={'usernames': [user.username for user in users]},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {'detail': 'Team must have at least one user'}
+
+    # nada foi removido
+    response = client.get(
+        f'/teams/{team_with_users.id}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+    assert_team_has_users(response.json(), users)
+
+
+def test_not_remove_member_from_team_that_does_not_exist(
+    client, owner_token, users
+):
+    response = client.delete(
+        f'/teams/0/members/{users[0].username}',
+        headers={'Authorization': f'Bearer {owner_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Team not found'}
+
+
 # >>>>>> TESTES DE DELETAR TIMES
 
 
@@ -337,6 +643,29 @@ def test_delete_team_successfully(client, owner_token, team_with_users):
     assert response.json() == {'message': 'Team deleted successfully'}
 
 
+def test_delete_team_with_a_single_statement(
+    client, session, owner_token, projects_with_teams, count_queries
+):
+    team_id = projects_with_teams.teams[0].id
+
+    with count_queries() as statements:
+        response = client.delete(
+            f'/teams/{team_id}',
+            headers={'Authorization': f'Bearer {owner_token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    # usuário logado e o DELETE; as associações saem pelo ON DELETE CASCADE
+    assert [statement.split()[0] for statement in statements] == [
+        'SELECT',
+        'DELETE',
+    ]
+    for table in (teams_users, projects_teams):
+        assert not session.scalar(
+            select(exists().where(table.c.team_id == team_id))
+        )
+
+
 # não deletar com um id que não existe (id maior que a quantidade de times)
 def test_not_delete_teams_with_id_greater_than_length(
     client, token, team_with_users
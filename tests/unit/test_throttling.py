@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from freezegun import freeze_time
+
+from task_flow import throttling
+from task_flow.hashing import hashing_executor
+from task_flow.throttling import LocalBuckets, LoginThrottle, load_backend
+
+pytestmark = pytest.mark.unit
+
+
+# substituto local de um backend compartilhado entre workers (Redis)
+shared_backend = LocalBuckets(evict_interval=60)
+
+
+def shared_buckets():
+    return shared_backend
+
+
+def login(client, username, password='senha_errada'):
+    return client.post(
+        '/auth/token', data={'username': username, 'password': password}
+    )
+
+
+def test_login_throttled_per_account_before_hashing(
+    client, user, count_queries
+):
+    for _ in range(throttling.settings.LOGIN_ACCOUNT_BURST):
+        response = login(client, user.email)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+    calls = hashing_executor.calls
+
+    with count_queries() as statements:
+        response = login(client, user.email, user.clean_password)
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['Retry-After']) > 0
+    # nem o SELECT do usuário nem o Argon2 rodam
+    assert statements == []
+    assert hashing_executor.calls == calls
+
+
+def test_login_throttled_per_ip(client, monkeypatch):
+    burst = 3
+    monkeypatch.setattr(throttling.settings, 'LOGIN_IP_BURST', burst)
+
+    for index in range(burst):
+        response = login(client, f'conta{index}@test.com')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    response = login(client, 'outra_conta@test.com')
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_bucket_refills_over_time():
+    buckets = LocalBuckets(evict_interval=60)
+    rate = 1 / 60
+
+    with freeze_time('2025-01-01 12:00:00') as frozen:
+        assert buckets.consume('chave', 1, rate) == 0
+        assert buckets.consume('chave', 1, rate) == pytest.approx(60)
+
+        frozen.tick(60)
+        assert buckets.consume('chave', 1, rate) == 0
+
+
+def test_full_buckets_are_evicted():
+    buckets = LocalBuckets(evict_interval=10)
+
+    with freeze_time('2025-01-01 12:00:00') as frozen:
+        buckets.consume('parado', 2, 1)
+        buckets.consume('ativo', 2, 0.01)
+
+        # 'parado' já se encheu de novo; 'ativo' ainda não
+        frozen.tick(10)
+        buckets.consume('outro', 2, 1)
+
+    # ficam 'ativo' e 'outro'
+    kept = 2
+    assert len(buckets) == kept
+
+
+def test_shared_backend_limits_every_worker():
+    backend = load_backend(f'{__name__}:shared_buckets')
+    first, second = LoginThrottle(backend), LoginThrottle(backend)
+
+    for _ in range(throttling.settings.LOGIN_ACCOUNT_BURST):
+        assert first.retry_after('10.0.0.1', 'conta@test.com') == 0
+
+    # outro worker, outro IP: a conta já gastou as tentativas
+    assert second.retry_after('10.0.0.2', 'Conta@test.com') > 0
@@ -2,10 +2,13 @@
 from http import HTTPStatus
 
 import pytest
+from sqlalchemy import exists, select
 
 # import do projeto
-from task_flow.database import get_user_count
+from task_flow.counting import row_counter
+from task_flow.models import User, teams_users
 from task_flow.schemas import UserPublic
+from task_flow.security import verify_password
 
 pytestmark = pytest.mark.unit
 
@@ -25,6 +28,23 @@ def test_create_user(client):
     assert data['email'] == 'bolinha@teste.com'
 
 
+def test_create_user_runs_a_single_insert(client, count_queries):
+    with count_queries() as statements:
+        response = client.post(
+            '/users',
+            json={
+                'username': 'bolinha_teste',
+                'email': 'bolinha@teste.com',
+                'password': 'password',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    # sem SELECT prévio (o conflito vem da constraint unique) e sem
+    # refresh depois do commit (a resposta vem do RETURNING)
+    assert [statement.split()[0] for statement in statements] == ['INSERT']
+
+
 def test_not_create_user_already_registered(client, user):
     response = client.post(
         '/users/',
@@ -73,12 +93,125 @@ def test_not_create_user_password_less_than_6(client):
     )
 
 
+def test_create_users_bulk(client, session):
+    batch = [
+        {
+            'username': f'lote{i}',
+            'email': f'lote{i}@teste.com',
+            'password': f'senha{i}{i}',
+        }
+        for i in range(3)
+    ]
+
+    response = client.post('/users/bulk', json={'users': batch})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data['errors'] == []
+    assert [user['username'] for user in data['created']] == [
+        'lote0',
+        'lote1',
+        'lote2',
+    ]
+    for item, created in zip(batch, data['created']):
+        db_user = session.get(User, created['id'])
+        assert verify_password(item['password'], db_user.password)
+
+
+def test_create_users_bulk_reports_errors_per_item(client, user):
+    batch = [
+        {'username': 'novo', 'email': 'novo@teste.com', 'password': '123456'},
+        {
+            'username': user.username,
+            'email': 'outro@teste.com',
+            'password': '123456',
+        },
+        {'username': 'outro', 'email': user.email, 'password': '123456'},
+        {'username': 'novo', 'email': 'novo2@teste.com', 'password': '123456'},
+        {'username': 'novo3', 'email': 'novo@teste.com', 'password': '123456'},
+    ]
+
+    response = client.post('/users/bulk', json={'users': batch})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [user['username'] for user in data['created']] == ['novo']
+    assert data['errors'] == [
+        {'index': 1, 'detail': 'Username already registered'},
+        {'index': 2, 'detail': 'Email already registered'},
+        {'index': 3, 'detail': 'Username repeated in batch'},
+        {'index': 4, 'detail': 'Email repeated in batch'},
+    ]
+
+
+def test_create_users_bulk_reports_invalid_items(client):
+    batch = [
+        {'username': 'ok', 'email': 'ok@teste.com', 'password': '123456'},
+        {'username': 'curta', 'email': 'curta@teste.com', 'password': '123'},
+        {'username': 'email', 'email': 'nao-e-email', 'password': '123456'},
+        {'username': 'ok2', 'email': 'ok2@teste.com', 'password': '1234567'},
+    ]
+
+    response = client.post('/users/bulk', json={'users': batch})
+
+    # um item inválido não derruba o lote: vira o erro daquele índice
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [user['username'] for user in data['created']] == ['ok', 'ok2']
+    assert [error['index'] for error in data['errors']] == [1, 2]
+    assert data['errors'][0]['detail'].startswith('password: ')
+    assert data['errors'][1]['detail'].startswith('email: ')
+
+
+def test_create_users_bulk_reports_items_that_are_not_objects(client):
+    batch = [
+        'oops',
+        {'username': 'ok', 'email': 'ok@teste.com', 'password': '123456'},
+        None,
+    ]
+
+    response = client.post('/users/bulk', json={'users': batch})
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [user['username'] for user in data['created']] == ['ok']
+    assert data['errors'] == [
+        {'index': 0, 'detail': 'Item must be an object'},
+        {'index': 2, 'detail': 'Item must be an object'},
+    ]
+
+
+def test_create_users_bulk_runs_constant_queries(client, count_queries):
+    batch = [
+        {
+            'username': f'lote{i}',
+            'email': f'lote{i}@teste.com',
+            'password': '123456',
+        }
+        for i in range(5)
+    ]
+
+    with count_queries() as statements:
+        response = client.post('/users/bulk', json={'users': batch})
+
+    assert len(response.json()['created']) == len(batch)
+    # checagem de conflitos e um INSERT de várias linhas
+    query_count = 2
+    assert len(statements) == query_count
+
+
+def test_not_create_users_bulk_with_empty_batch(client):
+    response = client.post('/users/bulk', json={'users': []})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 # teste para ler usuários com sucesso
 def test_read_users(client):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_read_one_user(client, user):
@@ -98,7 +231,42 @@ def test_read_users_with_user(client, user):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
+
+
+def test_read_users_paginated_with_cursor(client, users):
+    page_size = 2
+
+    response = client.get('/users/', params={'limit': page_size})
+    first_page = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(first_page['users']) == page_size
+    assert 'X-Total-Count' not in response.headers
+
+    response = client.get(
+        '/users/',
+        params={'limit': page_size, 'cursor': first_page['next_cursor']},
+    )
+    second_page = response.json()
+
+    assert [u['id'] for u in first_page['users'] + second_page['users']] == [
+        user.id for user in users
+    ]
+    assert second_page['next_cursor'] is None
+
+
+def test_read_users_with_total_count(client, users):
+    response = client.get('/users/', params={'include_total': True})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['X-Total-Count'] == str(len(users))
+
+
+def test_not_read_users_with_limit_above_maximum(client):
+    response = client.get('/users/', params={'limit': 1_000_000})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
 # teste para validar que não é possível ter id menor que 1
@@ -112,7 +280,8 @@ def test_not_read_invalid_user_id_less_than_1(client):
 
 # validar de ID maior que total de usuários
 def test_not_read_invalid_user_id_grater_than_length(client, session):
-    response = client.get('/users/' + str(get_user_count(session) + 1))
+    user_count = row_counter.exact(session, User)
+    response = client.get(f'/users/{user_count + 1}')
 
     assert response.status_code == HTTPStatus.NOT_FOUND
 
@@ -137,6 +306,47 @@ def test_update_user(client, user, token):
     }
 
 
+def test_update_user_does_not_refresh(client, user, token, count_queries):
+    url = f'/users/{user.id}'
+
+    with count_queries() as statements:
+        response = client.put(
+            url,
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'username': 'testusername02',
+                'email': 'teste@teste.com',
+                'password': 'teste123',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    # o usuário logado vem do identity map da sessão (session.get), então
+    # só o UPDATE ... RETURNING vai ao banco
+    assert [statement.split()[0] for statement in statements] == ['UPDATE']
+
+
+def test_update_user_invalidates_cached_principal(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    # a leitura coloca o usuário no cache de principals
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'testusername02',
+            'email': 'teste@teste.com',
+            'password': 'teste123',
+        },
+    )
+
+    # o subject do token antigo não existe mais
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
 # teste para editar um usuario sem permissão
 def test_not_update_wrong_user(client, other_user, token):
     response = client.put(
@@ -187,6 +397,37 @@ def test_delete_user(client, user, token):
     assert response.json() == {'message': 'User deleted successfully'}
 
 
+def test_delete_user_removes_team_memberships(
+    client, session, team_with_users, users
+):
+    member = users[1]
+    token = client.post(
+        '/auth/token',
+        data={'username': member.email, 'password': member.clean_password},
+    ).json()['access_token']
+
+    response = client.delete(
+        f'/users/{member.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert not session.scalar(
+        select(exists().where(teams_users.c.user_id == member.id))
+    )
+
+
+def test_delete_user_invalidates_cached_principal(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    client.delete(f'/users/{user.id}', headers=headers)
+
+    response = client.get('/search/?q=time', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
 def test_not_delete_wrong_user(client, other_user, token):
     response = client.delete(
         f'/users/{other_user.id}',
@@ -63,7 +63,7 @@ def find_team(client, headers, team_name):
 
     response.raise_for_status()
 
-    teams = response.json()
+    teams = response.json()['teams']
 
     if not teams:
         return None